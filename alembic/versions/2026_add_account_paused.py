@@ -0,0 +1,30 @@
+"""Add paused flag to account
+
+Revision ID: 2026_add_account_paused
+Revises: 2026_add_automation_generation
+Create Date: 2026-10-19 05:30:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "2026_add_account_paused"
+down_revision: Union[str, None] = "2026_add_automation_generation"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "account",
+        sa.Column("paused", sa.Boolean(), nullable=False, server_default="false"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("account", "paused")
@@ -0,0 +1,39 @@
+"""Add automation generation to user and usertask
+
+Revision ID: 2026_add_automation_generation
+Revises: 2026_partition_usertask
+Create Date: 2026-10-19 05:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "2026_add_automation_generation"
+down_revision: Union[str, None] = "2026_partition_usertask"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Constant defaults: no table rewrite, existing rows read as generation 0
+    op.add_column(
+        "user",
+        sa.Column(
+            "automation_generation", sa.Integer(), nullable=False, server_default="0"
+        ),
+    )
+    # Added on the partitioned parent, so every partition gets the column
+    op.add_column(
+        "usertask",
+        sa.Column("generation", sa.Integer(), nullable=False, server_default="0"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("usertask", "generation")
+    op.drop_column("user", "automation_generation")
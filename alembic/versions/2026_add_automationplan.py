@@ -0,0 +1,37 @@
+"""Add automationplan table for idempotent daily planning
+
+Revision ID: 2026_add_automationplan
+Revises: 2026_add_queued_taskstatus
+Create Date: 2026-10-19 00:10:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "2026_add_automationplan"
+down_revision: Union[str, None] = "2026_add_queued_taskstatus"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "automationplan",
+        sa.Column("id", sa.Uuid(), nullable=False),
+        sa.Column("user_id", sa.Uuid(), nullable=False),
+        sa.Column("plan_date", sa.Date(), nullable=False),
+        sa.Column("runs", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["user.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("user_id", "plan_date", name="uq_automationplan_user_date"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("automationplan")
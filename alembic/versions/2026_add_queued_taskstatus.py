@@ -0,0 +1,56 @@
+"""Add QUEUED to taskstatus enum and index usertask.scheduled_time
+
+Revision ID: 2026_add_queued_taskstatus
+Revises: 2025_add_usertask_task_id, merge_add_google_key_heads
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "2026_add_queued_taskstatus"
+down_revision: Union[str, Sequence[str], None] = (
+    "2025_add_usertask_task_id",
+    "merge_add_google_key_heads",
+)
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        "CREATE TYPE taskstatus_new AS ENUM('PENDING','QUEUED','PROCESSING','COMPLETED','FAILED','STOPPED')"
+    )
+    op.execute(
+        "ALTER TABLE usertask ALTER COLUMN status TYPE taskstatus_new USING status::text::taskstatus_new"
+    )
+    op.execute("DROP TYPE taskstatus")
+    op.execute("ALTER TYPE taskstatus_new RENAME TO taskstatus")
+
+    # The dispatcher polls this column for due rows
+    op.create_index(
+        op.f("ix_usertask_scheduled_time"),
+        "usertask",
+        ["scheduled_time"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_usertask_scheduled_time"), table_name="usertask")
+
+    # Rows waiting in the broker go back to plain PENDING
+    op.execute("UPDATE usertask SET status = 'PENDING' WHERE status = 'QUEUED'")
+    op.execute(
+        "CREATE TYPE taskstatus_old AS ENUM('PENDING','PROCESSING','COMPLETED','FAILED','STOPPED')"
+    )
+    op.execute(
+        "ALTER TABLE usertask ALTER COLUMN status TYPE taskstatus_old USING status::text::taskstatus_old"
+    )
+    op.execute("DROP TYPE taskstatus")
+    op.execute("ALTER TYPE taskstatus_old RENAME TO taskstatus")
@@ -0,0 +1,49 @@
+"""Add run timing to usertask and planning window to user
+
+Revision ID: 2026_add_slot_allocation_fields
+Revises: 2026_add_user_automation_enabled
+Create Date: 2026-10-19 00:30:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "2026_add_slot_allocation_fields"
+down_revision: Union[str, None] = "2026_add_user_automation_enabled"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("usertask", sa.Column("started_at", sa.DateTime(), nullable=True))
+    op.add_column("usertask", sa.Column("finished_at", sa.DateTime(), nullable=True))
+    op.add_column(
+        "user",
+        sa.Column(
+            "automation_window_start",
+            sa.Integer(),
+            nullable=False,
+            server_default="0",
+        ),
+    )
+    op.add_column(
+        "user",
+        sa.Column(
+            "automation_window_end",
+            sa.Integer(),
+            nullable=False,
+            server_default="24",
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("user", "automation_window_end")
+    op.drop_column("user", "automation_window_start")
+    op.drop_column("usertask", "finished_at")
+    op.drop_column("usertask", "started_at")
@@ -0,0 +1,48 @@
+"""Add SKIPPED status, expires_at and schedule_lag to usertask
+
+Revision ID: 2026_add_task_expiry
+Revises: 2026_add_slot_allocation_fields
+Create Date: 2026-10-19 00:40:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "2026_add_task_expiry"
+down_revision: Union[str, None] = "2026_add_slot_allocation_fields"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        "CREATE TYPE taskstatus_new AS ENUM('PENDING','QUEUED','PROCESSING','COMPLETED','FAILED','STOPPED','SKIPPED')"
+    )
+    op.execute(
+        "ALTER TABLE usertask ALTER COLUMN status TYPE taskstatus_new USING status::text::taskstatus_new"
+    )
+    op.execute("DROP TYPE taskstatus")
+    op.execute("ALTER TYPE taskstatus_new RENAME TO taskstatus")
+
+    op.add_column("usertask", sa.Column("expires_at", sa.DateTime(), nullable=True))
+    op.add_column("usertask", sa.Column("schedule_lag", sa.Float(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("usertask", "schedule_lag")
+    op.drop_column("usertask", "expires_at")
+
+    op.execute("UPDATE usertask SET status = 'STOPPED' WHERE status = 'SKIPPED'")
+    op.execute(
+        "CREATE TYPE taskstatus_old AS ENUM('PENDING','QUEUED','PROCESSING','COMPLETED','FAILED','STOPPED')"
+    )
+    op.execute(
+        "ALTER TABLE usertask ALTER COLUMN status TYPE taskstatus_old USING status::text::taskstatus_old"
+    )
+    op.execute("DROP TYPE taskstatus")
+    op.execute("ALTER TYPE taskstatus_old RENAME TO taskstatus")
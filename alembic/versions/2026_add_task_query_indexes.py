@@ -0,0 +1,114 @@
+"""Add composite and partial indexes for hot task and account queries
+
+Revision ID: 2026_add_task_query_indexes
+Revises: 2026_add_user_dispatch_fields
+Create Date: 2026-10-19 01:30:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "2026_add_task_query_indexes"
+down_revision: Union[str, None] = "2026_add_user_dispatch_fields"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ACTIVE = sa.text("status IN ('PENDING', 'QUEUED', 'PROCESSING')")
+PENDING = sa.text("status = 'PENDING'")
+
+
+def upgrade() -> None:
+    # Built concurrently so a large usertask table stays writable meanwhile
+    with op.get_context().autocommit_block():
+        # Account listing and planning filter accounts by owner
+        op.create_index(
+            "ix_account_owner_id",
+            "account",
+            ["owner_id"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        # Per-user task listings and start/stop lookups by (user, status);
+        # the leading user_id also serves user-only filters
+        op.create_index(
+            "ix_usertask_user_id_status",
+            "usertask",
+            ["user_id", "status"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        # Rows that still matter to the dispatcher are a small, hot slice of
+        # the table: expiry and in-flight counts only look at these
+        op.create_index(
+            "ix_usertask_active_status_expires_at",
+            "usertask",
+            ["status", "expires_at"],
+            postgresql_where=ACTIVE,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        # Due-row polling, globally and per user
+        op.create_index(
+            "ix_usertask_pending_scheduled_time",
+            "usertask",
+            ["scheduled_time"],
+            postgresql_where=PENDING,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            "ix_usertask_pending_user_id_scheduled_time",
+            "usertask",
+            ["user_id", "scheduled_time"],
+            postgresql_where=PENDING,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        # Covered by the leading column of ix_usertask_user_id_status
+        op.drop_index(
+            "ix_usertask_user_id",
+            table_name="usertask",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        # Every query on scheduled_time is limited to PENDING or active rows,
+        # which the partial indexes above serve from a much smaller slice
+        op.drop_index(
+            "ix_usertask_scheduled_time",
+            table_name="usertask",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_usertask_scheduled_time",
+            "usertask",
+            ["scheduled_time"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            "ix_usertask_user_id",
+            "usertask",
+            ["user_id"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        for name, table in (
+            ("ix_usertask_pending_user_id_scheduled_time", "usertask"),
+            ("ix_usertask_pending_scheduled_time", "usertask"),
+            ("ix_usertask_active_status_expires_at", "usertask"),
+            ("ix_usertask_user_id_status", "usertask"),
+            ("ix_account_owner_id", "account"),
+        ):
+            op.drop_index(
+                name, table_name=table, postgresql_concurrently=True, if_exists=True
+            )
@@ -0,0 +1,45 @@
+"""Add automation_enabled to user
+
+Revision ID: 2026_add_user_automation_enabled
+Revises: 2026_add_automationplan
+Create Date: 2026-10-19 00:20:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "2026_add_user_automation_enabled"
+down_revision: Union[str, None] = "2026_add_automationplan"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "user",
+        sa.Column(
+            "automation_enabled",
+            sa.Boolean(),
+            nullable=False,
+            server_default=sa.false(),
+        ),
+    )
+    # Users with work still scheduled were running under the per-user chain
+    op.execute(
+        """
+        UPDATE "user" SET automation_enabled = true
+        WHERE id IN (
+            SELECT DISTINCT user_id FROM usertask
+            WHERE status IN ('PENDING', 'QUEUED', 'PROCESSING')
+        )
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("user", "automation_enabled")
@@ -0,0 +1,40 @@
+"""Add dispatch weight and concurrency cap to user
+
+Revision ID: 2026_add_user_dispatch_fields
+Revises: 2026_add_task_expiry
+Create Date: 2026-10-19 01:10:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "2026_add_user_dispatch_fields"
+down_revision: Union[str, None] = "2026_add_task_expiry"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "user",
+        sa.Column("dispatch_weight", sa.Float(), nullable=False, server_default="1.0"),
+    )
+    op.add_column(
+        "user", sa.Column("max_concurrent_tasks", sa.Integer(), nullable=True)
+    )
+    # The dispatcher earns a user's weight in credits every round, so a
+    # weight of zero or less would never let it finish a round
+    op.create_check_constraint(
+        "ck_user_dispatch_weight_min", "user", "dispatch_weight >= 0.1"
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint("ck_user_dispatch_weight_min", "user", type_="check")
+    op.drop_column("user", "max_concurrent_tasks")
+    op.drop_column("user", "dispatch_weight")
@@ -0,0 +1,115 @@
+"""Range-partition usertask by month of created_at
+
+Revision ID: 2026_partition_usertask
+Revises: 2026_add_task_query_indexes
+Create Date: 2026-10-19 01:50:00.000000
+
+"""
+
+from datetime import date, datetime, timezone
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "2026_partition_usertask"
+down_revision: Union[str, None] = "2026_add_task_query_indexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Months created past the current one; the maintenance task keeps this up
+MONTHS_AHEAD = 2
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def create_indexes() -> None:
+    op.create_index("ix_usertask_task_id", "usertask", ["task_id"])
+    op.create_index("ix_usertask_user_id_status", "usertask", ["user_id", "status"])
+    op.create_index(
+        "ix_usertask_active_status_expires_at",
+        "usertask",
+        ["status", "expires_at"],
+        postgresql_where=sa.text("status IN ('PENDING', 'QUEUED', 'PROCESSING')"),
+    )
+    op.create_index(
+        "ix_usertask_pending_scheduled_time",
+        "usertask",
+        ["scheduled_time"],
+        postgresql_where=sa.text("status = 'PENDING'"),
+    )
+    op.create_index(
+        "ix_usertask_pending_user_id_scheduled_time",
+        "usertask",
+        ["user_id", "scheduled_time"],
+        postgresql_where=sa.text("status = 'PENDING'"),
+    )
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    op.execute("ALTER TABLE usertask RENAME TO usertask_legacy")
+    op.execute(
+        "CREATE TABLE usertask (LIKE usertask_legacy INCLUDING DEFAULTS "
+        "INCLUDING CONSTRAINTS) PARTITION BY RANGE (created_at)"
+    )
+
+    # One partition per month, from the oldest row to a little ahead of now
+    oldest = conn.execute(
+        sa.text("SELECT min(created_at) FROM usertask_legacy")
+    ).scalar()
+    this_month = datetime.now(timezone.utc).date().replace(day=1)
+    month = (oldest.date() if oldest else this_month).replace(day=1)
+    last = add_months(this_month, MONTHS_AHEAD)
+    while month <= last:
+        op.execute(
+            f"CREATE TABLE usertask_p{month:%Y_%m} PARTITION OF usertask "
+            f"FOR VALUES FROM ('{month}') TO ('{add_months(month, 1)}')"
+        )
+        month = add_months(month, 1)
+
+    # Catches rows past the last month, should the maintenance task fall
+    # behind; celery_worker/partitions.py moves them out again
+    op.execute("CREATE TABLE usertask_default PARTITION OF usertask DEFAULT")
+
+    op.execute("INSERT INTO usertask SELECT * FROM usertask_legacy")
+    op.execute("DROP TABLE usertask_legacy")
+
+    # The partition key has to be part of the primary key
+    op.create_primary_key("usertask_pkey", "usertask", ["id", "created_at"])
+    op.create_foreign_key(
+        "usertask_user_id_fkey", "usertask", "user", ["user_id"], ["id"]
+    )
+    op.create_foreign_key(
+        "usertask_account_id_fkey", "usertask", "account", ["account_id"], ["id"]
+    )
+    create_indexes()
+    # A user's tasks newest first; the ordered scan stops at the partitions
+    # that hold enough rows
+    op.create_index(
+        "ix_usertask_user_id_created_at", "usertask", ["user_id", "created_at"]
+    )
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE usertask RENAME TO usertask_partitioned")
+    op.execute(
+        "CREATE TABLE usertask (LIKE usertask_partitioned INCLUDING DEFAULTS "
+        "INCLUDING CONSTRAINTS)"
+    )
+    op.execute("INSERT INTO usertask SELECT * FROM usertask_partitioned")
+    op.execute("DROP TABLE usertask_partitioned CASCADE")
+
+    op.create_primary_key("usertask_pkey", "usertask", ["id"])
+    op.create_foreign_key(
+        "usertask_user_id_fkey", "usertask", "user", ["user_id"], ["id"]
+    )
+    op.create_foreign_key(
+        "usertask_account_id_fkey", "usertask", "account", ["account_id"], ["id"]
+    )
+    create_indexes()
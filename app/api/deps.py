@@ -1,16 +1,20 @@
-from collections.abc import Generator
+import uuid
+from collections.abc import AsyncGenerator, Generator
 from typing import Annotated
 
 import jwt
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, status
 from fastapi.security import OAuth2PasswordBearer
 from jwt.exceptions import InvalidTokenError
 from pydantic import ValidationError
+from sqlalchemy.orm import make_transient_to_detached
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.core import security
+from app.core.cache import user_cache
 from app.core.config import settings
-from app.core.db import engine
+from app.core.db import async_engine, engine
 from app.models.user_model import TokenPayload, User
 
 reusable_oauth2 = OAuth2PasswordBearer(
@@ -23,11 +27,23 @@ def get_db() -> Generator[Session, None, None]:
         yield session
 
 
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    # Objects stay readable after commit, as async code cannot lazy-refresh them
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        yield session
+
+
 SessionDep = Annotated[Session, Depends(get_db)]
+AsyncSessionDep = Annotated[AsyncSession, Depends(get_async_db)]
 TokenDep = Annotated[str, Depends(reusable_oauth2)]
 
 
 def get_current_user(session: SessionDep, token: TokenDep) -> User:
+    return get_token_user(session, token, scope=None)
+
+
+def get_token_user(session: Session, token: str, scope: str | None) -> User:
+    """The active user ``token`` was issued to, if it carries ``scope``."""
     try:
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=[security.ALGORITHM]
@@ -38,7 +54,12 @@ def get_current_user(session: SessionDep, token: TokenDep) -> User:
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Could not validate credentials",
         )
-    user = session.get(User, token_data.sub)
+    if token_data.scope != scope:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Could not validate credentials",
+        )
+    user = get_user_cached(session, token_data.sub)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     if not user.is_active:
@@ -46,9 +67,52 @@ def get_current_user(session: SessionDep, token: TokenDep) -> User:
     return user
 
 
+def get_user_cached(session: Session, user_id: str | None) -> User | None:
+    """
+    ``session.get(User, user_id)``, served from ``user_cache`` when possible.
+
+    The user is attached to ``session`` as if it had been loaded there, so
+    routes can still change and commit ``current_user``. A miss is read on a
+    short-lived session of its own: ``session`` would otherwise keep a pooled
+    connection checked out for the whole request, even in async routes that
+    never use it. Anything that changes or deletes a user must drop it from
+    the cache.
+    """
+    try:
+        key = uuid.UUID(str(user_id))
+    except ValueError:
+        return None
+    data = user_cache.get(key)
+    if data is None:
+        with Session(engine) as lookup:
+            found = lookup.get(User, key)
+            if found is None:
+                return None
+            data = found.model_dump()
+        if data["is_active"]:
+            user_cache.set(key, data)
+    user = User(**data)
+    make_transient_to_detached(user)
+    session.add(user)
+    return user
+
+
 CurrentUser = Annotated[User, Depends(get_current_user)]
 
 
+def get_current_user_from_query(token: Annotated[str, Query()]) -> User:
+    # EventSource cannot send headers, so streams pass the token in the URL.
+    # Only short-lived stream tokens are taken there: URLs end up in proxy
+    # and access logs. The session closes before the response starts: a
+    # stream stays open for as long as the page does and must not hold a
+    # connection meanwhile.
+    with Session(engine) as session:
+        return get_token_user(session, token, scope=security.STREAM_SCOPE)
+
+
+QueryTokenUser = Annotated[User, Depends(get_current_user_from_query)]
+
+
 def get_current_active_superuser(current_user: CurrentUser) -> User:
     if not current_user.is_superuser:
         raise HTTPException(
@@ -2,17 +2,20 @@ import uuid
 from typing import Any
 
 from fastapi import APIRouter, HTTPException
-from sqlmodel import func, select
+from sqlmodel import col, delete, func, select, update
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.api.deps import CurrentUser, SessionDep
+from app.api.deps import AsyncSessionDep, CurrentUser
 from app.models.account_model import (
     Account,
     AccountCreate,
+    AccountIds,
     AccountPublic,
     AccountsPublic,
     AccountUpdate,
 )
-from app.models.user_model import Message
+from app.models.task_model import UserTask
+from app.models.user_model import Message, User
 from automation.enums.platform import Platform
 
 router = APIRouter()
@@ -31,8 +34,8 @@ def get_platforms() -> Any:
 
 
 @router.get("/", response_model=AccountsPublic)
-def read_accounts(
-    session: SessionDep, current_user: CurrentUser, skip: int = 0, limit: int = 100
+async def read_accounts(
+    session: AsyncSessionDep, current_user: CurrentUser, skip: int = 0, limit: int = 100
 ) -> Any:
     """
     Retrieve accounts.
@@ -40,33 +43,69 @@ def read_accounts(
 
     if current_user.is_superuser:
         count_statement = select(func.count()).select_from(Account)
-        count = session.exec(count_statement).one()
+        count = (await session.exec(count_statement)).one()
         statement = select(Account).offset(skip).limit(limit)
-        accounts = session.exec(statement).all()
+        accounts = (await session.exec(statement)).all()
     else:
         count_statement = (
             select(func.count())
             .select_from(Account)
             .where(Account.owner_id == current_user.id)
         )
-        count = session.exec(count_statement).one()
+        count = (await session.exec(count_statement)).one()
         statement = (
             select(Account)
             .where(Account.owner_id == current_user.id)
             .offset(skip)
             .limit(limit)
         )
-        accounts = session.exec(statement).all()
+        accounts = (await session.exec(statement)).all()
 
     return AccountsPublic(data=accounts, count=count)
 
 
+@router.post("/pause")
+async def pause_accounts(
+    session: AsyncSessionDep, current_user: CurrentUser, accounts_in: AccountIds
+) -> Message:
+    """
+    Pause accounts: their planned runs stay queued but none is started.
+    """
+    count = await set_paused(session, current_user, accounts_in.ids, True)
+    return Message(message=f"Paused {count} accounts.")
+
+
+@router.post("/resume")
+async def resume_accounts(
+    session: AsyncSessionDep, current_user: CurrentUser, accounts_in: AccountIds
+) -> Message:
+    """
+    Resume paused accounts; their runs that have not expired start as due.
+    """
+    count = await set_paused(session, current_user, accounts_in.ids, False)
+    return Message(message=f"Resumed {count} accounts.")
+
+
+async def set_paused(
+    session: AsyncSession, current_user: User, ids: list[uuid.UUID], paused: bool
+) -> int:
+    # One UPDATE for the whole set; ids the user doesn't own are ignored
+    statement = update(Account).where(col(Account.id).in_(ids)).values(paused=paused)
+    if not current_user.is_superuser:
+        statement = statement.where(col(Account.owner_id) == current_user.id)
+    result = await session.exec(statement)
+    await session.commit()
+    return result.rowcount
+
+
 @router.get("/{id}", response_model=AccountPublic)
-def read_account(session: SessionDep, current_user: CurrentUser, id: uuid.UUID) -> Any:
+async def read_account(
+    session: AsyncSessionDep, current_user: CurrentUser, id: uuid.UUID
+) -> Any:
     """
     Get account by ID.
     """
-    account = session.get(Account, id)
+    account = await session.get(Account, id)
     if not account:
         raise HTTPException(status_code=404, detail="Account not found")
     if not current_user.is_superuser and (account.owner_id != current_user.id):
@@ -75,23 +114,23 @@ def read_account(session: SessionDep, current_user: CurrentUser, id: uuid.UUID)
 
 
 @router.post("/", response_model=AccountPublic)
-def create_account(
-    *, session: SessionDep, current_user: CurrentUser, account_in: AccountCreate
+async def create_account(
+    *, session: AsyncSessionDep, current_user: CurrentUser, account_in: AccountCreate
 ) -> Any:
     """
     Create new account.
     """
     account = Account.model_validate(account_in, update={"owner_id": current_user.id})
     session.add(account)
-    session.commit()
-    session.refresh(account)
+    await session.commit()
+    await session.refresh(account)
     return account
 
 
 @router.put("/{id}", response_model=AccountPublic)
-def update_account(
+async def update_account(
     *,
-    session: SessionDep,
+    session: AsyncSessionDep,
     current_user: CurrentUser,
     id: uuid.UUID,
     account_in: AccountUpdate,
@@ -99,7 +138,7 @@ def update_account(
     """
     Update an account.
     """
-    account = session.get(Account, id)
+    account = await session.get(Account, id)
     if not account:
         raise HTTPException(status_code=404, detail="Account not found")
     if not current_user.is_superuser and (account.owner_id != current_user.id):
@@ -107,23 +146,28 @@ def update_account(
     update_dict = account_in.model_dump(exclude_unset=True)
     account.sqlmodel_update(update_dict)
     session.add(account)
-    session.commit()
-    session.refresh(account)
+    await session.commit()
+    await session.refresh(account)
     return account
 
 
 @router.delete("/{id}")
-def delete_account(
-    session: SessionDep, current_user: CurrentUser, id: uuid.UUID
+async def delete_account(
+    session: AsyncSessionDep, current_user: CurrentUser, id: uuid.UUID
 ) -> Message:
     """
     Delete an account.
     """
-    account = session.get(Account, id)
+    account = await session.get(Account, id)
     if not account:
         raise HTTPException(status_code=404, detail="Account not found")
     if not current_user.is_superuser and (account.owner_id != current_user.id):
         raise HTTPException(status_code=400, detail="Not enough permissions")
-    session.delete(account)
-    session.commit()
+    # Same outcome as an ORM delete, which would lazy-load every task just to
+    # null its account_id
+    await session.exec(
+        update(UserTask).where(col(UserTask.account_id) == id).values(account_id=None)
+    )
+    await session.exec(delete(Account).where(col(Account.id) == id))
+    await session.commit()
     return Message(message="Account deleted successfully")
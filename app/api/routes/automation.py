@@ -1,21 +1,43 @@
 import os
-import random
+import re
 import uuid
-from datetime import datetime, timedelta
-from typing import List
+from collections.abc import AsyncIterator
+from datetime import datetime, timedelta, timezone
+from typing import Any, List, Literal
 
-from fastapi import APIRouter, Depends, HTTPException
+from celery import states
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from sqlmodel import select
+from sqlmodel import col, delete, func, select, update
+from sqlmodel.ext.asyncio.session import AsyncSession
+from starlette.concurrency import run_in_threadpool
 
 from app import crud
-from app.api.deps import CurrentUser, SessionDep
+from app.api.deps import AsyncSessionDep, CurrentUser, QueryTokenUser
+from app.core import security
+from app.core.cache import TTLCache, user_cache
+from app.core.config import settings
+from app.core.db import async_engine
+from app.core.redis import get_async_redis
 from app.models.account_model import Account
-from app.models.task_model import TaskStatus, UserTask, UserTaskCreate, UserTaskUpdate
+from app.models.task_model import (
+    AutomationPlan,
+    TaskStatus,
+    UserTask,
+    UserTaskCreate,
+    UserTaskUpdate,
+)
+from app.models.user_model import User
 from automation.config.config import Config
 from automation.utils.logging_utils import fast_api_logger as logger
+from celery_worker import cleanup
+from celery_worker.admission import admit
+from celery_worker.breaker import breaker_states
 from celery_worker.celery_worker import celery_worker
+from celery_worker.events import user_channel
 from celery_worker.task import schedule_task_automation
+from celery_worker.task_logs import task_log_key
 
 # Create a router for automation
 router = APIRouter()
@@ -29,84 +51,429 @@ class AutomationStatus(BaseModel):
     error: str | None = None
 
 
-@router.get("/automation_status/", response_model=List[AutomationStatus])
-async def get_automation_status(current_user: CurrentUser, session: SessionDep):
-
-    # Query tasks from the database for the current user
-    statement = select(UserTask).where(UserTask.user_id == current_user.id)
-    user_tasks = session.exec(statement).all()
-
-    automation_statuses = []
-    for task in user_tasks:
-        # Prefer DB-stored status so the dashboard continues to show records even
-        # after we revoke tasks. Only query Celery for live runtime info when
-        # we have an associated Celery task id stored.
-        err_msg = None
-        runtime_status = None
-        runtime_result = None
-        if getattr(task, "task_id", None):
-            try:
-                result = celery_worker.AsyncResult(str(task.task_id))
-                info = result.info
-                if info and isinstance(info, dict):
-                    err_msg = (
-                        info.get("exc_message") or info.get("exc_type") or str(info)
-                    )
-                elif info:
-                    err_msg = str(info)
-
-                runtime_status = result.status
-                runtime_result = result.result if result.successful() else None
-            except Exception:
-                # If querying Celery fails, fall back to the DB status
-                logger.exception("Failed to query celery for task %s", str(task.id))
-
-        automation_statuses.append(
-            AutomationStatus(
-                account_id=str(task.account_id),
-                task_id=str(task.id),
-                status=(runtime_status or task.status.value),
-                result=runtime_result,
-                error=err_msg,
-            )
+class AutomationStatusesPublic(BaseModel):
+    data: list[AutomationStatus]
+    # Whether another page follows; a total would cost a count over the
+    # user's whole history on every cache miss
+    has_more: bool
+
+
+# Polling clients hit the status page every second; a short cache absorbs it
+status_cache = TTLCache("automation_status", settings.AUTOMATION_STATUS_CACHE_SECONDS)
+
+
+class StreamToken(BaseModel):
+    token: str
+    expires_in: int
+
+
+# Redis stream ids, used as log cursors
+STREAM_ID_PATTERN = r"^\d+-\d+$"
+
+
+class TaskLogEntry(BaseModel):
+    id: str
+    time: datetime
+    level: str
+    message: str
+
+
+class TaskLogPage(BaseModel):
+    data: list[TaskLogEntry]
+    # Pass back as ``cursor`` to read the lines after this page
+    cursor: str
+
+
+class TaskDeletionProgress(BaseModel):
+    # running, done or failed
+    status: str
+    total: int
+    deleted: int
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+
+
+# Selectable /stats windows over created_at; None means all history
+STATS_WINDOWS: dict[str, timedelta | None] = {
+    "24h": timedelta(hours=24),
+    "7d": timedelta(days=7),
+    "30d": timedelta(days=30),
+    "all": None,
+}
+
+
+class AccountTaskStats(BaseModel):
+    account_id: str
+    email: str
+    paused: bool
+    total: int
+    by_status: dict[str, int]
+
+
+class AutomationStats(BaseModel):
+    window: str
+    since: datetime | None = None
+    accounts: int
+    paused_accounts: int
+    tasks: int
+    by_status: dict[str, int]
+    # Tasks per platform and status, by the platforms each account uploads to
+    by_platform: dict[str, dict[str, int]]
+    by_account: list[AccountTaskStats]
+
+
+stats_cache = TTLCache("automation_stats", settings.AUTOMATION_STATS_CACHE_SECONDS)
+
+
+class CircuitBreakerStatus(BaseModel):
+    platform: str
+    state: str
+    failures: int
+    opened_at: datetime | None = None
+    retry_at: datetime | None = None
+
+
+@router.get("/automation_status/", response_model=AutomationStatusesPublic)
+async def get_automation_status(
+    current_user: CurrentUser,
+    session: AsyncSessionDep,
+    skip: int = Query(default=0, ge=0),
+    limit: int = Query(default=100, ge=1, le=500),
+    status: TaskStatus | None = None,
+    account_id: uuid.UUID | None = None,
+    since: datetime | None = None,
+) -> Any:
+    """
+    Page through the current user's tasks, newest first.
+
+    ``since`` limits the listing to tasks created after that time, which
+    also keeps the query on the recent usertask partitions.
+    """
+    filters = [UserTask.user_id == current_user.id]
+    if status is not None:
+        filters.append(UserTask.status == status)
+    if account_id is not None:
+        filters.append(UserTask.account_id == account_id)
+    if since is not None:
+        filters.append(UserTask.created_at >= since)
+
+    parts = (current_user.id, skip, limit, status, account_id, since)
+    cached = await run_in_threadpool(status_cache.get, *parts)
+    if cached is not None:
+        return cached
+
+    # One row past the page tells whether another page follows
+    rows = (
+        await session.exec(
+            select(UserTask.id, UserTask.account_id, UserTask.task_id, UserTask.status)
+            .where(*filters)
+            .order_by(col(UserTask.created_at).desc())
+            .offset(skip)
+            .limit(limit + 1)
         )
+    ).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
 
-    return automation_statuses
+    # Prefer DB-stored status so the dashboard continues to show records
+    # even after we revoke tasks; the result backend only adds live runtime
+    # info for rows with a Celery id, read for the whole page at once.
+    try:
+        metas = await run_in_threadpool(
+            fetch_task_meta, [row.task_id for row in rows if row.task_id]
+        )
+    except Exception:
+        # If querying Celery fails, fall back to the DB status
+        logger.exception("Failed to read celery results for the status page")
+        metas = {}
+    data = [automation_status(row, metas.get(row.task_id)).model_dump() for row in rows]
+    value = {"data": data, "has_more": has_more}
+    await run_in_threadpool(status_cache.set, value, *parts)
+    return value
+
+
+@router.post("/stream_token", response_model=StreamToken)
+def create_stream_token(current_user: CurrentUser) -> Any:
+    """
+    Issue a token for opening /events and log follow streams.
+
+    EventSource cannot send headers, so these streams take their token in
+    the URL. This one expires after STREAM_TOKEN_EXPIRE_SECONDS and opens
+    nothing but streams, so what reaches access logs is of little use.
+    """
+    expires_in = settings.STREAM_TOKEN_EXPIRE_SECONDS
+    token = security.create_access_token(
+        current_user.id,
+        expires_delta=timedelta(seconds=expires_in),
+        scope=security.STREAM_SCOPE,
+    )
+    return StreamToken(token=token, expires_in=expires_in)
+
+
+@router.get("/events")
+async def automation_events(
+    request: Request, current_user: QueryTokenUser
+) -> StreamingResponse:
+    """
+    Stream the user's task progress as Server-Sent Events.
+
+    Each ``task`` event carries the task id, its status and, while it runs,
+    the current step, platform and progress. Nothing is replayed: load
+    /automation_status/ first, then apply events on top. ``token`` comes
+    from /stream_token.
+    """
+    return StreamingResponse(
+        task_events(request, current_user.id),
+        media_type="text/event-stream",
+        # Keep reverse proxies from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
-@router.post("/stop_automation")
-async def stop_automation(
-    session: SessionDep,
+async def task_events(request: Request, user_id: uuid.UUID) -> AsyncIterator[str]:
+    # Closing the pubsub drops its connection and with it the subscription
+    async with get_async_redis().pubsub(ignore_subscribe_messages=True) as pubsub:
+        await pubsub.subscribe(user_channel(user_id))
+        # Have the browser wait a bit before reconnecting after a drop
+        yield "retry: 5000\n\n"
+        while not await request.is_disconnected():
+            message = await pubsub.get_message(
+                timeout=settings.EVENTS_KEEPALIVE_SECONDS
+            )
+            if message is None:
+                yield ": keepalive\n\n"
+                continue
+            yield f"event: task\ndata: {message['data']}\n\n"
+
+
+@router.get("/tasks/{task_id}/logs", response_model=TaskLogPage)
+async def read_task_log(
+    session: AsyncSessionDep,
     current_user: CurrentUser,
-):
-    # Cancel all scheduled Celery tasks belonging to the user by revoking each task id
-    # We avoid revoking by user id (which the broker may interpret differently) and
-    # instead revoke per-scheduled `task_id` stored on the UserTask rows.
+    task_id: uuid.UUID,
+    cursor: str = Query(default="0-0", pattern=STREAM_ID_PATTERN),
+    limit: int = Query(default=500, ge=1, le=5000),
+) -> Any:
+    """
+    Read one run's log lines after ``cursor``, oldest first.
+
+    Logs are kept for TASK_LOG_TTL_SECONDS after a run's last line, capped
+    at TASK_LOG_MAX_ENTRIES lines.
+    """
+    await check_task_owner(session, current_user, task_id)
+    entries = await get_async_redis().xrange(
+        task_log_key(task_id), min=f"({cursor}", count=limit
+    )
+    data = [task_log_entry(entry_id, fields) for entry_id, fields in entries]
+    return TaskLogPage(data=data, cursor=data[-1].id if data else cursor)
+
+
+@router.get("/tasks/{task_id}/logs/follow")
+async def follow_task_log(
+    request: Request,
+    current_user: QueryTokenUser,
+    task_id: uuid.UUID,
+    cursor: str = Query(default="0-0", pattern=STREAM_ID_PATTERN),
+) -> StreamingResponse:
+    """
+    Stream one run's log as Server-Sent Events, starting after ``cursor``.
+
+    Every ``log`` event carries the stream id as its event id, so a
+    reconnecting EventSource resumes where it left off. ``token`` comes
+    from /stream_token; once it has expired, reopen the stream with a fresh
+    one and the last id seen as ``cursor``.
+    """
+    # Checked in its own session: the stream outlives the request scope
+    async with AsyncSession(async_engine) as session:
+        await check_task_owner(session, current_user, task_id)
+    last_event_id = request.headers.get("last-event-id")
+    if last_event_id and re.match(STREAM_ID_PATTERN, last_event_id):
+        cursor = last_event_id
+    return StreamingResponse(
+        task_log_events(request, task_id, cursor),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def task_log_events(
+    request: Request, task_id: uuid.UUID, cursor: str
+) -> AsyncIterator[str]:
+    client = get_async_redis()
+    key = task_log_key(task_id)
+    block_ms = int(settings.EVENTS_KEEPALIVE_SECONDS * 1000)
+    yield "retry: 5000\n\n"
+    while not await request.is_disconnected():
+        # Each XREAD blocks on its own pooled connection until lines arrive
+        response = await client.xread({key: cursor}, count=500, block=block_ms)
+        if not response:
+            yield ": keepalive\n\n"
+            continue
+        for entry_id, fields in response[0][1]:
+            entry = task_log_entry(entry_id, fields)
+            cursor = entry_id
+            yield f"id: {entry_id}\nevent: log\ndata: {entry.model_dump_json()}\n\n"
+
+
+async def check_task_owner(
+    session: AsyncSession, current_user: User, task_id: uuid.UUID
+) -> None:
+    statement = select(UserTask.user_id).where(UserTask.id == task_id)
+    owner_id = (await session.exec(statement)).first()
+    if owner_id is None:
+        raise HTTPException(status_code=404, detail="Task not found")
+    if not current_user.is_superuser and owner_id != current_user.id:
+        raise HTTPException(status_code=400, detail="Not enough permissions")
+
+
+def task_log_entry(entry_id: str, fields: dict[str, str]) -> TaskLogEntry:
+    return TaskLogEntry(
+        id=entry_id,
+        time=datetime.fromtimestamp(float(fields["ts"]), timezone.utc),
+        level=fields["level"],
+        message=fields["message"],
+    )
+
+
+@router.get("/stats", response_model=AutomationStats)
+async def get_automation_stats(
+    session: AsyncSessionDep,
+    current_user: CurrentUser,
+    window: Literal["24h", "7d", "30d", "all"] = "7d",
+) -> Any:
+    """
+    Task counts of the current user by status, platform and account.
+
+    Counted with one GROUP BY over the window's tasks plus one read of the
+    user's accounts. The GROUP BY still scans every task of the user in the
+    window, so ``30d`` and above all ``all`` grow with the history; results
+    are cached per user and window for that reason.
+    """
+    cached = await run_in_threadpool(stats_cache.get, current_user.id, window)
+    if cached is not None:
+        return cached
+
+    span = STATS_WINDOWS[window]
+    since = datetime.now(timezone.utc) - span if span else None
     statement = (
-        select(UserTask)
-        .where(UserTask.status == TaskStatus.PROCESSING)
+        select(UserTask.account_id, UserTask.status, func.count())
         .where(UserTask.user_id == current_user.id)
+        .group_by(UserTask.account_id, UserTask.status)
     )
-    processing_tasks = session.exec(statement).all()
-    for task in processing_tasks:
-        # Revoke the individual Celery task by its task id (task.task_id may be None)
-        try:
-            if getattr(task, "task_id", None):
-                celery_worker.control.revoke(str(task.task_id), terminate=True)
-        except Exception:
-            # Log and continue; revocation failure shouldn't block updating DB state
-            logger.exception(
-                "Failed to revoke celery task for usertask %s", str(task.id)
+    if since is not None:
+        statement = statement.where(UserTask.created_at >= since)
+    counts = (await session.exec(statement)).all()
+    accounts = (
+        await session.exec(
+            select(Account.id, Account.email, Account.platforms, Account.paused)
+            .where(Account.owner_id == current_user.id)
+            .order_by(Account.email)
+        )
+    ).all()
+
+    by_status: dict[str, int] = {}
+    by_account_status: dict[uuid.UUID, dict[str, int]] = {}
+    for account_id, status, count in counts:
+        by_status[status.value] = by_status.get(status.value, 0) + count
+        if account_id is not None:
+            statuses = by_account_status.setdefault(account_id, {})
+            statuses[status.value] = count
+
+    by_platform: dict[str, dict[str, int]] = {}
+    by_account = []
+    for account in accounts:
+        statuses = by_account_status.get(account.id, {})
+        by_account.append(
+            AccountTaskStats(
+                account_id=str(account.id),
+                email=account.email,
+                paused=account.paused,
+                total=sum(statuses.values()),
+                by_status=statuses,
             )
+        )
+        for platform in filter(None, (account.platforms or "").split(",")):
+            platform_statuses = by_platform.setdefault(platform.strip(), {})
+            for status, count in statuses.items():
+                platform_statuses[status] = platform_statuses.get(status, 0) + count
+
+    stats = AutomationStats(
+        window=window,
+        since=since,
+        accounts=len(accounts),
+        paused_accounts=sum(1 for account in accounts if account.paused),
+        tasks=sum(by_status.values()),
+        by_status=by_status,
+        by_platform=by_platform,
+        by_account=by_account,
+    ).model_dump(mode="json")
+    await run_in_threadpool(stats_cache.set, stats, current_user.id, window)
+    return stats
+
+
+@router.get("/circuit_breakers/", response_model=List[CircuitBreakerStatus])
+def get_circuit_breakers(current_user: CurrentUser):
+    # Breakers are shared by every user: they track the platforms themselves
+    return breaker_states()
+
 
-        # Mark the task as stopped so the dashboard still shows its record
-        task.status = TaskStatus.STOPPED
-        session.add(task)
+@router.post("/stop_automation")
+async def stop_automation(
+    session: AsyncSessionDep,
+    current_user: CurrentUser,
+):
+    """
+    Stop every run of the user, whatever state it is in.
+
+    Bumping the user's automation generation orphans every message already
+    in the broker: workers drop runs whose generation is stale before
+    opening a browser, so none of them has to be revoked. Only runs that are
+    already driving a browser are revoked, in one broadcast. Today's and
+    later plans are removed so starting again plans the day afresh.
+    """
+    now = datetime.now(timezone.utc)
+    # current_user belongs to the sync session, so the user row is written
+    # with a statement. This also waits for a plan being written right now.
+    await session.exec(
+        update(User)
+        .where(col(User.id) == current_user.id)
+        .values(
+            automation_enabled=False,
+            automation_generation=User.automation_generation + 1,
+        )
+    )
+    # Locked so none of them finishes between here and the UPDATE below
+    running = (
+        await session.exec(
+            select(UserTask.task_id)
+            .where(crud.live_task_window(now))
+            .where(UserTask.user_id == current_user.id)
+            .where(UserTask.status == TaskStatus.PROCESSING)
+            .with_for_update()
+        )
+    ).all()
+    # Mark the tasks as stopped so the dashboard still shows their records
+    await session.exec(
+        update(UserTask)
+        .where(crud.live_task_window(now))
+        .where(col(UserTask.user_id) == current_user.id)
+        .where(
+            col(UserTask.status).in_(
+                [TaskStatus.PENDING, TaskStatus.QUEUED, TaskStatus.PROCESSING]
+            )
+        )
+        .values(status=TaskStatus.STOPPED, updated_at=now)
+    )
+    await session.exec(
+        delete(AutomationPlan)
+        .where(col(AutomationPlan.user_id) == current_user.id)
+        .where(col(AutomationPlan.plan_date) >= now.date())
+    )
     try:
-        session.commit()
+        await session.commit()
     except Exception as e:
         # Rollback and return a clear error so the API doesn't surface a stack trace
-        session.rollback()
+        await session.rollback()
         logger.exception("Failed to update task statuses when stopping automation")
         raise HTTPException(
             status_code=500,
@@ -115,21 +482,29 @@ async def stop_automation(
                 "Check the database enum `taskstatus` includes configured values or inspect server logs."
             ),
         )
+    user_cache.delete(current_user.id)
+
+    # Broker publishes block, so they run off the event loop
+    await run_in_threadpool(
+        revoke_tasks, [celery_id for celery_id in running if celery_id]
+    )
     return {"message": "Automation stopped for all accounts."}
 
 
 @router.post("/start_automation")
 async def start_automation(
-    session: SessionDep,
+    session: AsyncSessionDep,
     current_user: CurrentUser,
 ):
     # Check if there are any active tasks already running for the user
     statement = (
-        select(UserTask)
+        select(UserTask.id)
+        .where(crud.live_task_window(datetime.now(timezone.utc)))
         .where(UserTask.status == TaskStatus.PROCESSING)
         .where(UserTask.user_id == current_user.id)
+        .limit(1)
     )
-    user_tasks = session.exec(statement).all()
+    user_tasks = (await session.exec(statement)).all()
     if user_tasks:
         raise HTTPException(
             status_code=400,
@@ -139,7 +514,7 @@ async def start_automation(
     logger.info(f"Starting automation for user {current_user.full_name}")
     # Retrieve all accounts for the user
     statement = select(Account).where(Account.owner_id == current_user.id)
-    accounts = session.exec(statement).all()
+    accounts = (await session.exec(statement)).all()
 
     if not accounts:
         raise HTTPException(
@@ -212,7 +587,7 @@ async def start_automation(
 
         # Quick Celery worker availability check
         try:
-            ping = celery_worker.control.ping(timeout=2)
+            ping = await run_in_threadpool(celery_worker.control.ping, timeout=2)
             if not ping:
                 logger.error("No Celery workers responded to ping")
                 raise HTTPException(
@@ -239,9 +614,48 @@ async def start_automation(
         logger.exception("Unexpected error during pre-start checks")
         raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
 
-    # Set up a recurring schedule
+    # Admission control: don't take on more than the browsers can run today
+    window = (current_user.automation_window_start, current_user.automation_window_end)
+    admission = await session.run_sync(
+        lambda sync_session: admit(sync_session, len(accounts), window)
+    )
+    if not admission.accepted:
+        retry_at = admission.retry_at
+        detail = f"The cluster has no room for {len(accounts)} accounts today. " + (
+            f"Try again from {retry_at.isoformat()}."
+            if retry_at
+            else "Try again later or with fewer accounts."
+        )
+        headers = None
+        if retry_at:
+            wait = retry_at - datetime.now(timezone.utc)
+            headers = {"Retry-After": str(max(int(wait.total_seconds()), 0))}
+        logger.info(
+            "Refused to start automation for user %s: %.0fs requested, %.0fs free",
+            current_user.id,
+            admission.requested_seconds,
+            admission.free_seconds,
+        )
+        raise HTTPException(status_code=429, detail=detail, headers=headers)
+    if admission.runs is not None:
+        logger.info(
+            "Starting automation for user %s with %d runs per account",
+            current_user.id,
+            admission.runs,
+        )
+
+    # Enroll the user in the nightly planning pass and plan today right away
+    await session.exec(
+        update(User)
+        .where(col(User.id) == current_user.id)
+        .values(automation_enabled=True)
+    )
+    await session.commit()
+    user_cache.delete(current_user.id)
     try:
-        schedule_automation(current_user.id)
+        await run_in_threadpool(
+            schedule_automation, current_user.id, runs=admission.runs
+        )
     except Exception as e:
         logger.exception("Failed to schedule automation tasks")
         raise HTTPException(
@@ -252,52 +666,142 @@ async def start_automation(
             ),
         )
 
-    session.commit()
     return {
         "message": "Automation started for all accounts.",
         "user_id": current_user.id,
+        # Set when today's runs were reduced to fit the free capacity
+        "runs_per_account": admission.runs,
     }
 
 
 @router.delete("/delete_all_user_tasks")
 async def delete_all_user_tasks(
-    session: SessionDep,
+    session: AsyncSessionDep,
     current_user: CurrentUser,
+    response: Response,
+    background: bool | None = None,
 ):
-    # Delete all tasks for the user
-    statement = select(UserTask).where(UserTask.user_id == current_user.id)
-    user_tasks = session.exec(statement).all()
-    for task in user_tasks:
-        session.delete(task)
-
-    session.commit()
-    return {"message": "All tasks deleted for the user."}
-
+    """
+    Delete all of the user's tasks, in batches of TASK_DELETE_BATCH_SIZE.
+
+    Histories over TASK_DELETE_INLINE_MAX rows go to a background job and the
+    call returns 202 right away; follow it at /delete_all_user_tasks/progress.
+    ``background`` forces one way or the other.
+    """
+    total = (
+        await session.exec(
+            select(func.count())
+            .select_from(UserTask)
+            .where(UserTask.user_id == current_user.id)
+        )
+    ).one()
+    if background is None:
+        background = total > settings.TASK_DELETE_INLINE_MAX
 
-def schedule_automation(user_id: uuid.UUID | str):
-    # Schedule the automation to run 10-15 times per day at random times
-    num_runs = random.randint(10, 15)
+    if background:
+        if not await run_in_threadpool(cleanup.start_progress, current_user.id, total):
+            raise HTTPException(
+                status_code=409, detail="Your tasks are already being deleted."
+            )
+        try:
+            await run_in_threadpool(
+                celery_worker.send_task,
+                "celery_worker.task.delete_user_tasks",
+                args=[str(current_user.id)],
+            )
+        except Exception as e:
+            await run_in_threadpool(cleanup.finish_progress, current_user.id, "failed")
+            logger.exception("Failed to queue task deletion")
+            raise HTTPException(
+                status_code=500, detail=f"Failed to queue task deletion: {str(e)}"
+            )
+        response.status_code = 202
+        return {"message": f"Deleting {total} tasks in the background.", "total": total}
+
+    # Each batch commits on its own to keep lock times short
+    statement = crud.user_tasks_batch(current_user.id, settings.TASK_DELETE_BATCH_SIZE)
+    deleted = 0
+    while batch := (await session.exec(statement)).rowcount:
+        await session.commit()
+        deleted += batch
+    await session.commit()
+    return {"message": "All tasks deleted for the user.", "deleted": deleted}
+
+
+@router.get("/delete_all_user_tasks/progress", response_model=TaskDeletionProgress)
+def get_task_deletion_progress(current_user: CurrentUser) -> Any:
+    """Progress of the user's latest background task deletion."""
+    progress = cleanup.read_progress(current_user.id)
+    if progress is None:
+        raise HTTPException(status_code=404, detail="No task deletion in progress")
+    return progress
+
+
+def schedule_automation(user_id: uuid.UUID | str, runs: int | None = None):
+    # Plan today on a worker; the following days are planned by the global
+    # plan_all_users job. Planning is idempotent per (user, date), so starting
+    # twice does not double the number of runs.
+    celery_worker.send_task(
+        "celery_worker.task.run_user_automation",
+        args=[str(user_id)],
+        kwargs={"runs": runs},
+    )
 
-    # Get the current date
-    today = datetime.now().date()
 
-    # Schedule tasks for today
-    for _ in range(num_runs):
-        # Generate a random time between 00:00 and 23:59
-        random_time = timedelta(minutes=random.randint(0, 1439))
-        schedule_time = datetime.combine(today, datetime.min.time()) + random_time
+def revoke_tasks(celery_ids: list[str]) -> None:
+    """Terminate the running Celery tasks ``celery_ids`` with one broadcast."""
+    if not celery_ids:
+        return
+    try:
+        celery_worker.control.revoke(celery_ids, terminate=True)
+    except Exception:
+        # Log and continue; the rows are already STOPPED
+        logger.exception("Failed to revoke %d running celery tasks", len(celery_ids))
+
+
+def fetch_task_meta(task_ids: list[str]) -> dict[str, dict]:
+    """Read the result-backend entries of ``task_ids`` in a single MGET."""
+    backend = celery_worker.backend
+    if not task_ids or not hasattr(backend, "get_key_for_task"):
+        return {}
+    keys = [backend.get_key_for_task(task_id) for task_id in task_ids]
+    return {
+        task_id: backend.decode(value)
+        for task_id, value in zip(task_ids, backend.client.mget(keys))
+        if value
+    }
 
-        celery_worker.send_task(
-            "celery_worker.task.run_user_automation",
-            args=[str(user_id)],
-            eta=schedule_time,
-        )
 
-    # Schedule the next day's automation
-    next_day = today + timedelta(days=1)
-    next_day_midnight = datetime.combine(next_day, datetime.min.time())
-    celery_worker.send_task(
-        "celery_worker.task.schedule_next_day",
-        args=[str(user_id)],
-        eta=next_day_midnight,
+def automation_status(row: Any, meta: dict | None) -> AutomationStatus:
+    """
+    Combine a task row with its result-backend entry, if there is one.
+
+    The Celery state only describes the row while it is queued or running.
+    Runs that claim_task defers, skips or drops return normally and are
+    stored as SUCCESS, and a redispatch reuses the Celery id, so once the
+    row has moved on its own status wins. Finished rows still take the
+    error or result of their last run from the entry.
+    """
+    live = row.status in (TaskStatus.QUEUED, TaskStatus.PROCESSING)
+    if not live and row.status not in (TaskStatus.FAILED, TaskStatus.COMPLETED):
+        meta = None
+    err_msg = None
+    runtime_result = None
+    info = meta.get("result") if meta else None
+    if info and isinstance(info, dict):
+        exc_message = info.get("exc_message")
+        # Celery stores an exception's args as a list
+        if isinstance(exc_message, list):
+            exc_message = " ".join(str(arg) for arg in exc_message)
+        err_msg = exc_message or info.get("exc_type") or str(info)
+    elif info:
+        err_msg = str(info)
+    if meta and meta.get("status") == states.SUCCESS and isinstance(info, dict):
+        runtime_result = info
+    return AutomationStatus(
+        account_id=str(row.account_id),
+        task_id=str(row.id),
+        status=(meta.get("status") if meta and live else None) or row.status.value,
+        result=runtime_result,
+        error=err_msg,
     )
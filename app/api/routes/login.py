@@ -8,6 +8,7 @@ from fastapi.security import OAuth2PasswordRequestForm
 from app import crud
 from app.api.deps import CurrentUser, SessionDep, get_current_active_superuser
 from app.core import security
+from app.core.cache import user_cache
 from app.core.config import settings
 from app.core.security import get_password_hash
 from app.models.user_model import Message, NewPassword, Token, UserPublic
@@ -95,6 +96,7 @@ def reset_password(session: SessionDep, body: NewPassword) -> Message:
     user.hashed_password = hashed_password
     session.add(user)
     session.commit()
+    user_cache.delete(user.id)
     return Message(message="Password updated successfully")
 
 
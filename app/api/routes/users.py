@@ -7,6 +7,7 @@ from sqlmodel import col, delete, func, select
 
 from app import crud
 from app.api.deps import CurrentUser, SessionDep, get_current_active_superuser
+from app.core.cache import user_cache
 from app.core.config import settings
 from app.core.security import get_password_hash, verify_password
 from app.models.account_model import Account
@@ -20,12 +21,24 @@ from app.models.user_model import (
     UsersPublic,
     UserUpdate,
     UserUpdateMe,
+    check_automation_window,
 )
 from app.utils import generate_new_account_email, send_email
 
 router = APIRouter()
 
 
+def check_window_update(user: User, user_data: dict[str, Any]) -> None:
+    """422 if a partial update would leave the user with an empty window."""
+    try:
+        check_automation_window(
+            user_data.get("automation_window_start", user.automation_window_start),
+            user_data.get("automation_window_end", user.automation_window_end),
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+
 @router.post("/me/google-key", response_model=Message)
 def upload_google_service_account(
     session: SessionDep, current_user: CurrentUser, file: UploadFile = File(...)
@@ -58,6 +71,7 @@ def upload_google_service_account(
     current_user.google_service_account_uploaded_at = datetime.utcnow()
     session.add(current_user)
     session.commit()
+    user_cache.delete(current_user.id)
     session.refresh(current_user)
 
     return Message(message="Google service account uploaded successfully")
@@ -87,6 +101,7 @@ def delete_google_service_account(
     current_user.google_service_account_uploaded_at = None
     session.add(current_user)
     session.commit()
+    user_cache.delete(current_user.id)
     session.refresh(current_user)
 
     return Message(message="Google service account removed")
@@ -153,9 +168,11 @@ def update_user_me(
                 status_code=409, detail="User with this email already exists"
             )
     user_data = user_in.model_dump(exclude_unset=True)
+    check_window_update(current_user, user_data)
     current_user.sqlmodel_update(user_data)
     session.add(current_user)
     session.commit()
+    user_cache.delete(current_user.id)
     session.refresh(current_user)
     return current_user
 
@@ -177,6 +194,7 @@ def update_password_me(
     current_user.hashed_password = hashed_password
     session.add(current_user)
     session.commit()
+    user_cache.delete(current_user.id)
     return Message(message="Password updated successfully")
 
 
@@ -201,6 +219,7 @@ def delete_user_me(session: SessionDep, current_user: CurrentUser) -> Any:
     session.exec(statement)  # type: ignore
     session.delete(current_user)
     session.commit()
+    user_cache.delete(current_user.id)
     return Message(message="User deleted successfully")
 
 
@@ -266,6 +285,7 @@ def update_user(
                 status_code=409, detail="User with this email already exists"
             )
 
+    check_window_update(db_user, user_in.model_dump(exclude_unset=True))
     db_user = crud.update_user(session=session, db_user=db_user, user_in=user_in)
     return db_user
 
@@ -288,4 +308,5 @@ def delete_user(
     session.exec(statement)  # type: ignore
     session.delete(user)
     session.commit()
+    user_cache.delete(user_id)
     return Message(message="User deleted successfully")
@@ -0,0 +1,125 @@
+import json
+import logging
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+from time import monotonic
+from typing import Any
+
+import redis
+
+from app.core.config import settings
+from app.core.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+
+class TTLCache:
+    """
+    Short-lived JSON values in Redis, shared by every API process.
+
+    Entries live under ``cache:<namespace>:`` and expire on their own after
+    ``ttl`` seconds. The cache is best effort: if Redis is unreachable, reads
+    miss and writes are dropped, so callers always fall back to the database.
+    """
+
+    def __init__(
+        self, namespace: str, ttl: float, client: redis.Redis | None = None
+    ) -> None:
+        self.prefix = f"cache:{namespace}:"
+        self.ttl_ms = int(ttl * 1000)
+        self._client = client
+
+    @property
+    def client(self) -> redis.Redis:
+        return self._client or get_redis()
+
+    def key(self, *parts: Any) -> str:
+        return self.prefix + ":".join(str(part) for part in parts)
+
+    def get(self, *parts: Any) -> Any | None:
+        try:
+            raw = self.client.get(self.key(*parts))
+        except redis.RedisError:
+            logger.warning("Cache read failed for %s", self.key(*parts))
+            return None
+        return None if raw is None else json.loads(raw)
+
+    def set(self, value: Any, *parts: Any) -> None:
+        if self.ttl_ms <= 0:
+            return
+        try:
+            self.client.set(
+                self.key(*parts), json.dumps(value, default=str), px=self.ttl_ms
+            )
+        except redis.RedisError:
+            logger.warning("Cache write failed for %s", self.key(*parts))
+
+    def get_or_set(self, parts: tuple[Any, ...], load: Callable[[], Any]) -> Any:
+        """Return the cached value for ``parts``, loading and storing it on a miss."""
+        value = self.get(*parts)
+        if value is None:
+            value = load()
+            self.set(value, *parts)
+        return value
+
+    def delete(self, *parts: Any) -> None:
+        try:
+            self.client.delete(self.key(*parts))
+        except redis.RedisError:
+            logger.warning("Cache delete failed for %s", self.key(*parts))
+
+    def delete_prefix(self, *parts: Any) -> None:
+        """Drop every entry whose key starts with ``parts``."""
+        pattern = self.key(*parts) + "*"
+        try:
+            keys = list(self.client.scan_iter(match=pattern, count=500))
+            if keys:
+                self.client.delete(*keys)
+        except redis.RedisError:
+            logger.warning("Cache delete failed for %s", pattern)
+
+
+class LocalTTLCache:
+    """
+    Small in-process LRU cache whose entries also expire after ``ttl`` seconds.
+
+    For values read on nearly every request, where even a Redis round trip
+    is too much. Each process has its own copy, so ``delete`` only reaches
+    the calling process; the others see a change once their entry expires.
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict[Any, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Any) -> Any | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Any, value: Any) -> None:
+        if self.ttl <= 0 or self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: Any) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+# Column values of active users by id, for resolving tokens without a query
+user_cache = LocalTTLCache(settings.USER_CACHE_SIZE, settings.USER_CACHE_SECONDS)
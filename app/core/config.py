@@ -66,6 +66,136 @@ class Settings(BaseSettings):
             path=self.POSTGRES_DB,
         )
 
+    @computed_field  # type: ignore[prop-decorator]
+    @property
+    def SQLALCHEMY_ASYNC_DATABASE_URI(self) -> PostgresDsn:
+        return MultiHostUrl.build(
+            scheme="postgresql+asyncpg",
+            username=self.POSTGRES_USER,
+            password=self.POSTGRES_PASSWORD,
+            host=self.POSTGRES_SERVER,
+            port=self.POSTGRES_PORT,
+            path=self.POSTGRES_DB,
+        )
+
+    # Connection pooling depends on the process: "api" for uvicorn, "threads"
+    # for thread-pool Celery workers and "prefork" for prefork children, which
+    # connect per transaction. DB_PGBOUNCER disables prepared statements for
+    # PgBouncer in transaction-pooling mode.
+    DB_POOL_ROLE: Literal["api", "threads", "prefork"] = "api"
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 5
+    DB_THREADS_POOL_SIZE: int = 4
+    DB_PGBOUNCER: bool = False
+
+    # Redis used for coordination between workers (leases, limits, events)
+    REDIS_URL: str = "redis://localhost:6379/0"
+
+    # Just-in-time dispatcher: how often due UserTask rows are polled, how far
+    # ahead of their scheduled_time they are handed to the broker, and the
+    # maximum number of rows claimed per poll.
+    DISPATCH_INTERVAL_SECONDS: float = 5.0
+    DISPATCH_LOOKAHEAD_SECONDS: int = 10
+    DISPATCH_BATCH_SIZE: int = 500
+    # A planned run that has not started this long after its scheduled_time is
+    # skipped rather than replayed late.
+    TASK_EXPIRY_SECONDS: int = 1800
+
+    # Daily planner: each user gets a number of runs per day drawn from this
+    # range.
+    AUTOMATION_RUNS_PER_DAY_MIN: int = 10
+    AUTOMATION_RUNS_PER_DAY_MAX: int = 15
+    # UTC time of day at which the global planner plans every enabled user
+    AUTOMATION_PLANNER_HOUR: int = 0
+    AUTOMATION_PLANNER_MINUTE: int = 0
+
+    # Slot allocation: browsers the cluster can run at once, the size of the
+    # buckets runs are booked into, and the task duration assumed until enough
+    # runs have finished to measure it (over the last N days).
+    BROWSER_SLOTS: int = 4
+    SLOT_BUCKET_MINUTES: int = 5
+    DEFAULT_TASK_DURATION_SECONDS: int = 600
+    TASK_DURATION_WINDOW_DAYS: int = 7
+    # PROCESSING rows that started longer ago than this are assumed to belong
+    # to a dead worker and no longer count against concurrency limits.
+    TASK_STALE_AFTER_SECONDS: int = 3600
+    # usertask is partitioned by month of created_at: months created ahead of
+    # time, days of history kept attached, and the schema retired months are
+    # archived into (empty: drop them instead).
+    USERTASK_PARTITION_MONTHS_AHEAD: int = 2
+    USERTASK_RETENTION_DAYS: int = 180
+    # Runs are planned for the day they are created on and expire
+    # TASK_EXPIRY_SECONDS after their slot, so no PENDING/QUEUED/PROCESSING
+    # row is older than this. Queries over live runs bound created_at by it
+    # to stay on the newest partitions; the nightly maintenance closes any
+    # live row that is older anyway.
+    TASK_LIVE_MAX_AGE_HOURS: int = 48
+    USERTASK_ARCHIVE_SCHEMA: str | None = "archive"
+    USERTASK_MAINTENANCE_HOUR: int = 3
+    # Clearing a user's task history deletes this many rows per transaction;
+    # histories larger than TASK_DELETE_INLINE_MAX go to a background job
+    # unless the caller asks otherwise
+    TASK_DELETE_BATCH_SIZE: int = 5000
+    TASK_DELETE_INLINE_MAX: int = 50000
+
+    # How long a page of /automation/automation_status/ is served from cache
+    AUTOMATION_STATUS_CACHE_SECONDS: float = 2.0
+    # ... and how long a user's /automation/stats are
+    AUTOMATION_STATS_CACHE_SECONDS: float = 30.0
+    # Users cached per API process for token resolution. A change made
+    # through another process shows up here within USER_CACHE_SECONDS.
+    USER_CACHE_SIZE: int = 1024
+    USER_CACHE_SECONDS: float = 30.0
+    # Comment line sent down idle /automation/events streams so proxies keep
+    # them open
+    EVENTS_KEEPALIVE_SECONDS: float = 15.0
+    # Lifetime of the tokens that open /automation/events and log follow
+    # streams. They sit in the URL, and so in proxy and access logs; a token
+    # is only checked when a stream opens, so a short one does not cut
+    # streams off.
+    STREAM_TOKEN_EXPIRE_SECONDS: int = 60
+
+    # Per-run log streams (tasklog:<id>): entries kept per run and how long a
+    # run's log outlives its last line
+    TASK_LOG_MAX_ENTRIES: int = 5000
+    TASK_LOG_TTL_SECONDS: int = 7 * 24 * 3600
+
+    # Admission control on start: the fewest runs per account per day worth
+    # starting with, and how many days ahead to look for room otherwise.
+    ADMISSION_MIN_RUNS_PER_DAY: int = 1
+    ADMISSION_LOOKAHEAD_DAYS: int = 7
+
+    # Per-account execution lease: expiry if a worker dies mid-run, and how
+    # long a run that finds its account busy is pushed back.
+    ACCOUNT_LEASE_TTL_SECONDS: int = 120
+    ACCOUNT_LEASE_DEFER_SECONDS: int = 300
+
+    # Videos are downloaded on the drive-io pool ahead of their run; a run
+    # whose video is not on disk yet is pushed back this long meanwhile.
+    VIDEO_PREFETCH_DEFER_SECONDS: int = 120
+
+    # Cluster-wide upload budgets, as token buckets in Redis. Rates are uploads
+    # per hour; platforms missing from the mapping are not limited. The
+    # per-account and per-egress buckets are off while their rate is 0, and
+    # EGRESS_ID names the outbound IP this worker uploads from.
+    PLATFORM_UPLOADS_PER_HOUR: dict[str, float] = {
+        "youtube": 60,
+        "tiktok": 30,
+        "instagram": 30,
+        "facebook": 30,
+    }
+    PLATFORM_UPLOAD_BURST: int = 5
+    ACCOUNT_UPLOADS_PER_HOUR: float = 0
+    EGRESS_UPLOADS_PER_HOUR: float = 0
+    EGRESS_ID: str | None = None
+
+    # Per-platform circuit breaker: consecutive failed uploads before a
+    # platform is left out, how long it stays out, and how long a half-open
+    # probe may run before another run is allowed to probe instead.
+    BREAKER_FAILURE_THRESHOLD: int = 5
+    BREAKER_COOLDOWN_SECONDS: int = 900
+    BREAKER_PROBE_TTL_SECONDS: int = 1800
+
     SMTP_TLS: bool = True
     SMTP_SSL: bool = False
     SMTP_PORT: int = 587
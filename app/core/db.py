@@ -1,22 +1,54 @@
+import threading
+import uuid
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from time import perf_counter
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
 from sqlmodel import Session, create_engine, select
 
 from app import crud
 from app.core.config import settings
 from app.models.user_model import User, UserCreate
 
-# Enable pool_pre_ping to avoid using stale / closed connections from the
-# connection pool. Add a small connect timeout so initial network/connect
-# attempts fail fast instead of hanging indefinitely. Tune pool_size and
-# max_overflow to reasonable defaults for local deployments — adjust for
-# production as needed.
-engine = create_engine(
-    str(settings.SQLALCHEMY_DATABASE_URI),
-    pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20,
+
+def pool_options(role: str) -> dict[str, Any]:
+    """
+    Pool settings for the kind of process building the engine.
+
+    ``api`` processes keep a small pool per uvicorn worker, ``threads``
+    (planning and Drive Celery pools) share a small pool between their
+    threads, and ``prefork`` children (browser workers, flower) use no pool at
+    all: each one touches the database for a few short queries per run, so
+    holding idle connections in every child only multiplies server
+    connections with worker concurrency.
+    """
+    # pool_pre_ping avoids handing out stale / closed connections
+    if role == "prefork":
+        return {"pool_pre_ping": True, "poolclass": NullPool}
+    size, overflow = (
+        (settings.DB_POOL_SIZE, settings.DB_MAX_OVERFLOW)
+        if role == "api"
+        else (settings.DB_THREADS_POOL_SIZE, 0)
+    )
+    return {
+        "pool_pre_ping": True,
+        "pool_size": size,
+        "max_overflow": overflow,
+        # Wait up to 30s for a connection from the pool before raising
+        "pool_timeout": 30,
+    }
+
+
+def engine_options(role: str, pgbouncer: bool) -> dict[str, Any]:
+    """Pool and psycopg settings for the sync engine."""
     # connect_args passed to the DB driver (psycopg). Keepalives help detect
     # and recover from broken TCP connections (common in cloud networks).
-    connect_args={
+    connect_args: dict[str, Any] = {
         "connect_timeout": 10,
         # Enable TCP keepalives (supported by libpq/psycopg) so dead sockets are
         # detected sooner. Values are seconds.
@@ -24,12 +56,100 @@ engine = create_engine(
         "keepalives_idle": 60,
         "keepalives_interval": 15,
         "keepalives_count": 5,
-    },
-    # Wait up to 30s for a connection from the pool before raising
-    pool_timeout=30,
+    }
+    if pgbouncer:
+        # Transaction pooling hands each transaction to any server connection,
+        # so server-side prepared statements must stay off
+        connect_args["prepare_threshold"] = None
+    return {"connect_args": connect_args, **pool_options(role)}
+
+
+def async_engine_options(role: str, pgbouncer: bool) -> dict[str, Any]:
+    """Pool and asyncpg settings for the async engine used by the API."""
+    connect_args: dict[str, Any] = {"timeout": 10}
+    if pgbouncer:
+        # asyncpg always prepares statements; behind transaction pooling they
+        # must not be cached per connection and their names must not collide
+        connect_args.update(
+            statement_cache_size=0,
+            prepared_statement_cache_size=0,
+            prepared_statement_name_func=lambda: f"__asyncpg_{uuid.uuid4()}__",
+        )
+    return {"connect_args": connect_args, **pool_options(role)}
+
+
+engine = create_engine(
+    str(settings.SQLALCHEMY_DATABASE_URI),
+    **engine_options(settings.DB_POOL_ROLE, settings.DB_PGBOUNCER),
+)
+
+# Used by the routes through AsyncSessionDep; connects lazily, so processes
+# that never await a query never open one
+async_engine = create_async_engine(
+    str(settings.SQLALCHEMY_ASYNC_DATABASE_URI),
+    **async_engine_options(settings.DB_POOL_ROLE, settings.DB_PGBOUNCER),
 )
 
 
+def utc_naive(value: Any) -> Any:
+    """``value`` as naive UTC if it is an aware datetime, else unchanged."""
+    if isinstance(value, datetime) and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+@event.listens_for(async_engine.sync_engine, "before_cursor_execute", retval=True)
+def _bind_naive_utc(conn, cursor, statement, parameters, context, executemany):
+    # The timestamp columns hold naive UTC. psycopg converts aware datetimes
+    # on the server, but asyncpg encodes them against a naive epoch and
+    # fails, so the code shared by both engines (and everything the routes
+    # run through run_sync) keeps passing aware values and this converts them
+    if not parameters:
+        return statement, parameters
+    if executemany:
+        parameters = [tuple(map(utc_naive, row)) for row in parameters]
+    else:
+        parameters = tuple(map(utc_naive, parameters))
+    return statement, parameters
+
+
+class PoolUsage:
+    """Connections checked out, and for how long, within a ``pool_usage`` block."""
+
+    def __init__(self) -> None:
+        self.checkouts = 0
+        self.held_seconds = 0.0
+
+
+_pool_usage = threading.local()
+
+
+@event.listens_for(engine, "checkout")
+def _on_checkout(dbapi_connection, connection_record, connection_proxy) -> None:
+    connection_record.info["checked_out_at"] = perf_counter()
+
+
+@event.listens_for(engine, "checkin")
+def _on_checkin(dbapi_connection, connection_record) -> None:
+    checked_out_at = connection_record.info.pop("checked_out_at", None)
+    usage = getattr(_pool_usage, "current", None)
+    if usage is not None and checked_out_at is not None:
+        usage.checkouts += 1
+        usage.held_seconds += perf_counter() - checked_out_at
+
+
+@contextmanager
+def pool_usage() -> Iterator[PoolUsage]:
+    """Measure the pool connections the current thread uses inside the block."""
+    usage = PoolUsage()
+    previous = getattr(_pool_usage, "current", None)
+    _pool_usage.current = usage
+    try:
+        yield usage
+    finally:
+        _pool_usage.current = previous
+
+
 # make sure all SQLModel models are imported ( models) before initializing DB
 # otherwise, SQLModel might fail to initialize relationships properly
 # for more details: https://github.com/fastapi/full-stack-fastapi-template/issues/28
@@ -0,0 +1,19 @@
+from functools import lru_cache
+
+import redis
+import redis.asyncio
+
+from app.core.config import settings
+
+
+@lru_cache
+def get_redis() -> redis.Redis:
+    # One client (and connection pool) per process. redis-py resets the pool
+    # when it detects it is running in a forked child.
+    return redis.Redis.from_url(settings.REDIS_URL, decode_responses=True)
+
+
+@lru_cache
+def get_async_redis() -> redis.asyncio.Redis:
+    # For the API's long-lived event streams, which must not block the loop
+    return redis.asyncio.Redis.from_url(settings.REDIS_URL, decode_responses=True)
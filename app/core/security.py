@@ -11,10 +11,18 @@ pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
 
 ALGORITHM = "HS256"
 
+# Scope of the short-lived tokens that open event streams. They travel in the
+# URL, so they must not work as a bearer token for the rest of the API.
+STREAM_SCOPE = "stream"
 
-def create_access_token(subject: str | Any, expires_delta: timedelta) -> str:
+
+def create_access_token(
+    subject: str | Any, expires_delta: timedelta, scope: str | None = None
+) -> str:
     expire = datetime.now(timezone.utc) + expires_delta
     to_encode = {"exp": expire, "sub": str(subject)}
+    if scope:
+        to_encode["scope"] = scope
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
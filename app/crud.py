@@ -1,8 +1,14 @@
 import uuid
+from collections.abc import Sequence
+from datetime import datetime, timedelta, timezone
 from typing import Any
 
-from sqlmodel import Session, select
+from sqlalchemy import Delete, Row, delete, exists, insert, update
+from sqlalchemy.orm import aliased
+from sqlmodel import Session, col, select
 
+from app.core.cache import user_cache
+from app.core.config import settings
 from app.core.security import get_password_hash, verify_password
 from app.models.user_model import User, UserCreate, UserUpdate
 from app.models.account_model import Account, AccountCreate
@@ -29,6 +35,7 @@ def update_user(*, session: Session, db_user: User, user_in: UserUpdate) -> Any:
     db_user.sqlmodel_update(user_data, update=extra_data)
     session.add(db_user)
     session.commit()
+    user_cache.delete(db_user.id)
     session.refresh(db_user)
     return db_user
 
@@ -76,6 +83,230 @@ def create_task(
     return db_task
 
 
+def create_tasks(
+    *,
+    session: Session,
+    tasks_in: Sequence[UserTaskCreate],
+) -> Sequence[Row]:
+    """Insert many tasks in a single multi-row INSERT ... RETURNING.
+
+    Returns ``(id, task_id, scheduled_time)`` rows instead of ORM objects so
+    callers don't pay a refresh per row after the commit.
+    """
+    if not tasks_in:
+        return []
+    rows = [UserTask.model_validate(task_in).model_dump() for task_in in tasks_in]
+    statement = insert(UserTask).returning(
+        UserTask.id, UserTask.task_id, UserTask.scheduled_time
+    )
+    created = session.execute(statement, rows).all()
+    session.commit()
+    return created
+
+
+def live_task_window(now: datetime, task: Any = UserTask) -> Any:
+    """
+    Filter on created_at for queries over PENDING/QUEUED/PROCESSING tasks.
+
+    usertask is partitioned by month of created_at, and live tasks are never
+    older than TASK_LIVE_MAX_AGE_HOURS, so the bound keeps these queries on
+    the newest partitions without missing any live row. ``task`` is
+    ``UserTask`` or an alias of it.
+    """
+    since = now - timedelta(hours=settings.TASK_LIVE_MAX_AGE_HOURS)
+    return col(task.created_at) >= since
+
+
+def expire_stale_tasks(*, session: Session, now: datetime) -> int:
+    """Mark PENDING/QUEUED tasks whose ``expires_at`` has passed as SKIPPED."""
+    result = session.execute(
+        update(UserTask)
+        .where(live_task_window(now))
+        .where(col(UserTask.status).in_([TaskStatus.PENDING, TaskStatus.QUEUED]))
+        .where(col(UserTask.expires_at) < now)
+        .values(status=TaskStatus.SKIPPED, updated_at=now)
+    )
+    return result.rowcount
+
+
+def close_abandoned_tasks(*, session: Session, now: datetime) -> int:
+    """
+    Close live tasks older than the live window, which no hot query sees.
+
+    Waiting runs are SKIPPED and runs whose worker never reported back are
+    FAILED. Nothing the planner creates gets here; this catches leftovers
+    such as runs of a worker that died.
+    """
+    window = live_task_window(now)
+    closed = 0
+    for statuses, status in (
+        ([TaskStatus.PENDING, TaskStatus.QUEUED], TaskStatus.SKIPPED),
+        ([TaskStatus.PROCESSING], TaskStatus.FAILED),
+    ):
+        closed += session.execute(
+            update(UserTask)
+            .where(~window)
+            .where(col(UserTask.status).in_(statuses))
+            .values(status=status, updated_at=now)
+        ).rowcount
+    return closed
+
+
+def account_not_paused() -> Any:
+    """Filter for tasks whose account is not paused."""
+    return ~exists().where(col(Account.id) == UserTask.account_id, col(Account.paused))
+
+
+def claim_due_tasks(
+    *,
+    session: Session,
+    due_before: datetime,
+    limit: int,
+    user_id: uuid.UUID | None = None,
+) -> list[tuple[uuid.UUID, str, datetime | None, datetime | None]]:
+    """Lock PENDING tasks due before ``due_before`` and mark them QUEUED.
+
+    Rows are selected with ``FOR UPDATE SKIP LOCKED`` so several dispatchers
+    can poll concurrently without handing out the same row twice. Runs of
+    paused accounts stay PENDING until they resume or expire. When an
+    account has several due runs (workers fell behind) only the most recent
+    one is queued and the older ones are coalesced into it as SKIPPED; this
+    happens before ``limit`` applies, so a small claim never queues a run
+    that a later one already replaces.
+
+    The caller publishes the returned ``(id, task_id, scheduled_time,
+    expires_at)`` rows and then commits; rolling back returns them to PENDING.
+    ``user_id`` restricts the claim to one user's tasks.
+    """
+    now = datetime.now(timezone.utc)
+    window = live_task_window(now)
+    coalesce_due_tasks(
+        session=session, now=now, due_before=due_before, user_id=user_id
+    )
+    statement = (
+        select(
+            UserTask.id,
+            UserTask.task_id,
+            UserTask.scheduled_time,
+            UserTask.expires_at,
+            UserTask.account_id,
+        )
+        .where(window)
+        .where(UserTask.status == TaskStatus.PENDING)
+        .where(UserTask.scheduled_time <= due_before)
+        .where(account_not_paused())
+        .order_by(UserTask.scheduled_time)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    if user_id is not None:
+        statement = statement.where(UserTask.user_id == user_id)
+    due = session.exec(statement).all()
+    if not due:
+        return []
+
+    # Only runs due at the same time are left to coalesce here; rows are
+    # ordered by scheduled_time, so the last one per account wins
+    latest = {row.account_id: row for row in due}
+    queued = [row for row in due if latest[row.account_id] is row]
+    coalesced = [row.id for row in due if latest[row.account_id] is not row]
+
+    if coalesced:
+        session.execute(
+            update(UserTask)
+            .where(window)
+            .where(col(UserTask.id).in_(coalesced))
+            .values(status=TaskStatus.SKIPPED, updated_at=now)
+        )
+
+    # Rows created before Celery ids were pre-generated get one now
+    missing_ids = {row.id: str(uuid.uuid4()) for row in queued if not row.task_id}
+    for task_id, celery_id in missing_ids.items():
+        session.execute(
+            update(UserTask)
+            .where(window)
+            .where(UserTask.id == task_id)
+            .values(task_id=celery_id)
+        )
+    session.execute(
+        update(UserTask)
+        .where(window)
+        .where(col(UserTask.id).in_([row.id for row in queued]))
+        .values(status=TaskStatus.QUEUED, updated_at=now)
+    )
+    return [
+        (
+            row.id,
+            row.task_id or missing_ids[row.id],
+            row.scheduled_time,
+            row.expires_at,
+        )
+        for row in queued
+    ]
+
+
+def coalesce_due_tasks(
+    *,
+    session: Session,
+    now: datetime,
+    due_before: datetime,
+    user_id: uuid.UUID | None = None,
+) -> int:
+    """Mark due PENDING tasks SKIPPED when a later due task of the account waits.
+
+    Rows locked by another dispatcher are left to it, as in
+    ``claim_due_tasks``. Returns the number of tasks skipped.
+    """
+    later = aliased(UserTask)
+    superseded = (
+        select(UserTask.id)
+        .where(live_task_window(now))
+        .where(UserTask.status == TaskStatus.PENDING)
+        .where(UserTask.scheduled_time <= due_before)
+        .where(account_not_paused())
+        .where(
+            exists()
+            .where(live_task_window(now, later))
+            .where(later.account_id == UserTask.account_id)
+            .where(later.status == TaskStatus.PENDING)
+            .where(later.scheduled_time <= due_before)
+            .where(later.scheduled_time > UserTask.scheduled_time)
+        )
+        .with_for_update(skip_locked=True)
+    )
+    if user_id is not None:
+        superseded = superseded.where(UserTask.user_id == user_id)
+    return session.execute(
+        update(UserTask)
+        .where(live_task_window(now))
+        .where(col(UserTask.id).in_(superseded.scalar_subquery()))
+        .values(status=TaskStatus.SKIPPED, updated_at=now)
+    ).rowcount
+
+
+def user_tasks_batch(user_id: uuid.UUID, batch_size: int) -> Delete:
+    """DELETE for up to ``batch_size`` of a user's tasks, to run until it hits none.
+
+    Keeping each batch in its own transaction bounds how long row locks are
+    held when a user with a long history clears it.
+    """
+    batch = select(UserTask.id).where(UserTask.user_id == user_id).limit(batch_size)
+    return delete(UserTask).where(col(UserTask.id).in_(batch.scalar_subquery()))
+
+
+def set_task_fields(
+    *, session: Session, task_id: uuid.UUID | str, **values: Any
+) -> None:
+    """Update columns of one live task with a single UPDATE, without loading it."""
+    now = datetime.now(timezone.utc)
+    session.execute(
+        update(UserTask)
+        .where(live_task_window(now))
+        .where(UserTask.id == task_id)
+        .values(updated_at=now, **values)
+    )
+
+
 def update_task(
     *,
     session: Session,
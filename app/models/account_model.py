@@ -25,6 +25,8 @@ class AccountBase(SQLModel):
     facebook_group_id: Optional[str] = Field(default=None, max_length=255)
     facebook_post_to_page: Optional[bool] = Field(default=False)
     facebook_post_to_group: Optional[bool] = Field(default=False)
+    # Paused accounts keep their planned runs but none of them is started
+    paused: bool = Field(default=False)
 
 
 # Properties to receive on account creation
@@ -40,6 +42,7 @@ class AccountUpdate(SQLModel):
     google_drive_folder_id: Optional[str] = Field(default=None, max_length=255)
     platforms: Optional[str] = Field(default=None)
     password: Optional[str] = Field(default=None, min_length=8, max_length=40)
+    paused: Optional[bool] = Field(default=None)
 
 
 # Database model, table inferred from class name
@@ -47,7 +50,7 @@ class Account(AccountBase, table=True):
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     password: str = Field(max_length=40)  # Stored securely (hashed ideally)
     owner_id: uuid.UUID = Field(
-        foreign_key="user.id", nullable=False, ondelete="CASCADE"
+        foreign_key="user.id", nullable=False, ondelete="CASCADE", index=True
     )
     owner: Optional["User"] = Relationship(back_populates="accounts")
     tasks: List["UserTask"] = Relationship(back_populates="account")
@@ -63,3 +66,8 @@ class AccountPublic(AccountBase):
 class AccountsPublic(SQLModel):
     data: List[AccountPublic]
     count: int
+
+
+# Accounts to pause or resume in one request
+class AccountIds(SQLModel):
+    ids: List[uuid.UUID] = Field(min_length=1, max_length=1000)
@@ -1,3 +1,6 @@
 from app.models.account_model import Account
-from app.models.task_model import TaskStatus, UserTask
+from app.models.task_model import AutomationPlan, TaskStatus, UserTask
 from app.models.user_model import User
+
+# Imported by alembic/env.py so every table is registered on the metadata
+__all__ = ["Account", "AutomationPlan", "TaskStatus", "User", "UserTask"]
@@ -1,9 +1,10 @@
 import uuid
-from datetime import datetime, timezone
+from datetime import date, datetime, timezone
 from enum import Enum
 from typing import TYPE_CHECKING, List, Optional
 
 from pydantic import BaseModel
+from sqlalchemy import Index, UniqueConstraint, text
 from sqlmodel import Field, Relationship, SQLModel
 
 if TYPE_CHECKING:
@@ -13,10 +14,14 @@ if TYPE_CHECKING:
 
 class TaskStatus(str, Enum):
     PENDING = "PENDING"
+    # Handed to the broker by the dispatcher, waiting for a worker
+    QUEUED = "QUEUED"
     PROCESSING = "PROCESSING"
     COMPLETED = "COMPLETED"
     FAILED = "FAILED"
     STOPPED = "STOPPED"
+    # Expired before it could start, or coalesced into a later run
+    SKIPPED = "SKIPPED"
 
 
 class UserTaskBase(SQLModel):
@@ -26,9 +31,21 @@ class UserTaskBase(SQLModel):
     # Celery task id (the broker-assigned id for the background job). This is
     # distinct from the DB primary key `id` and is optional.
     task_id: Optional[str] = Field(default=None, index=True)
+    # Future runs live only here; the dispatcher polls this column for due rows
+    # through the partial indexes in UserTask.__table_args__
     scheduled_time: Optional[datetime] = Field(default=None)
-    user_id: uuid.UUID = Field(foreign_key="user.id", index=True)
+    # Indexed together with status on the table (see UserTask.__table_args__)
+    user_id: uuid.UUID = Field(foreign_key="user.id")
     account_id: Optional[uuid.UUID] = Field(foreign_key="account.id")
+    # A run that has not started by this time is skipped instead of replayed
+    expires_at: Optional[datetime] = Field(default=None)
+    # Wall-clock bounds of the browser run, used to measure task duration
+    started_at: Optional[datetime] = Field(default=None)
+    finished_at: Optional[datetime] = Field(default=None)
+    # Seconds between scheduled_time and the moment a worker picked the run up
+    schedule_lag: Optional[float] = Field(default=None)
+    # Owner's automation_generation when the run was planned
+    generation: int = Field(default=0)
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
@@ -51,8 +68,56 @@ class UserTaskPublic(UserTaskBase):
     user_id: uuid.UUID
 
 
-# Database model for storing tasks, with relationship to User model
+# Database model for storing tasks, with relationship to User model. In the
+# database the table is range-partitioned by month of created_at (see the
+# 2026_partition_usertask migration and celery_worker/partitions.py), which
+# requires created_at in the primary key. The partitioning itself is left to
+# the migrations; the model only matches the key, so updates of a loaded row
+# name its partition.
 class UserTask(UserTaskBase, table=True):
+    __table_args__ = (
+        Index("ix_usertask_user_id_status", "user_id", "status"),
+        # A user's tasks newest first, read one partition at a time
+        Index("ix_usertask_user_id_created_at", "user_id", "created_at"),
+        # Partial indexes over the small slice of rows the dispatcher works on
+        Index(
+            "ix_usertask_active_status_expires_at",
+            "status",
+            "expires_at",
+            postgresql_where=text("status IN ('PENDING', 'QUEUED', 'PROCESSING')"),
+        ),
+        Index(
+            "ix_usertask_pending_scheduled_time",
+            "scheduled_time",
+            postgresql_where=text("status = 'PENDING'"),
+        ),
+        Index(
+            "ix_usertask_pending_user_id_scheduled_time",
+            "user_id",
+            "scheduled_time",
+            postgresql_where=text("status = 'PENDING'"),
+        ),
+    )
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
+    created_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc), primary_key=True
+    )
     user: Optional["User"] = Relationship(back_populates="tasks")
     account: Optional["Account"] = Relationship(back_populates="tasks")
+
+
+# One row per user and day that has been planned. The unique constraint is what
+# makes planning idempotent: a second attempt for the same (user, date) inserts
+# nothing and therefore creates no tasks.
+class AutomationPlan(SQLModel, table=True):
+    __table_args__ = (
+        UniqueConstraint("user_id", "plan_date", name="uq_automationplan_user_date"),
+    )
+
+    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
+    user_id: uuid.UUID = Field(
+        foreign_key="user.id", nullable=False, ondelete="CASCADE"
+    )
+    plan_date: date
+    runs: int
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
@@ -2,7 +2,8 @@ import uuid
 from datetime import datetime
 from typing import TYPE_CHECKING, List
 
-from pydantic import EmailStr
+from pydantic import EmailStr, model_validator
+from sqlalchemy import CheckConstraint
 from sqlmodel import Field, Relationship, SQLModel
 
 if TYPE_CHECKING:
@@ -10,18 +11,40 @@ if TYPE_CHECKING:
     from models.task_model import UserTask
 
 
+def check_automation_window(start: int | None, end: int | None) -> None:
+    """Reject a window that leaves the planner no hours to schedule in."""
+    if start is not None and end is not None and start >= end:
+        raise ValueError(
+            "automation_window_start must be earlier than automation_window_end"
+        )
+
+
 # Shared properties
 class UserBase(SQLModel):
     email: EmailStr = Field(unique=True, index=True, max_length=255)
     is_active: bool = True
     is_superuser: bool = False
     full_name: str | None = Field(default=None, max_length=255)
+    # UTC hours [start, end) during which the planner may schedule runs
+    automation_window_start: int = Field(default=0, ge=0, le=23)
+    automation_window_end: int = Field(default=24, ge=1, le=24)
+    # Share of browser slots under contention relative to other users, and
+    # the most runs the dispatcher keeps in flight for them (None: no cap)
+    dispatch_weight: float = Field(default=1.0, ge=0.1, le=100)
+    max_concurrent_tasks: int | None = Field(default=None, ge=1)
 
 
 # Properties to receive via API on creation
 class UserCreate(UserBase):
     password: str = Field(min_length=8, max_length=40)
 
+    @model_validator(mode="after")
+    def _check_window(self) -> "UserCreate":
+        check_automation_window(
+            self.automation_window_start, self.automation_window_end
+        )
+        return self
+
 
 class UserRegister(SQLModel):
     email: EmailStr = Field(max_length=255)
@@ -34,10 +57,26 @@ class UserUpdate(UserBase):
     email: EmailStr | None = Field(default=None, max_length=255)  # type: ignore
     password: str | None = Field(default=None, min_length=8, max_length=40)
 
+    @model_validator(mode="after")
+    def _check_window(self) -> "UserUpdate":
+        check_automation_window(
+            self.automation_window_start, self.automation_window_end
+        )
+        return self
+
 
 class UserUpdateMe(SQLModel):
     full_name: str | None = Field(default=None, max_length=255)
     email: EmailStr | None = Field(default=None, max_length=255)
+    automation_window_start: int | None = Field(default=None, ge=0, le=23)
+    automation_window_end: int | None = Field(default=None, ge=1, le=24)
+
+    @model_validator(mode="after")
+    def _check_window(self) -> "UserUpdateMe":
+        check_automation_window(
+            self.automation_window_start, self.automation_window_end
+        )
+        return self
 
 
 class UpdatePassword(SQLModel):
@@ -47,6 +86,9 @@ class UpdatePassword(SQLModel):
 
 # Database model, database table inferred from class name
 class User(UserBase, table=True):
+    __table_args__ = (
+        CheckConstraint("dispatch_weight >= 0.1", name="ck_user_dispatch_weight_min"),
+    )
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     hashed_password: str
     accounts: List["Account"] = Relationship(back_populates="owner")
@@ -55,6 +97,11 @@ class User(UserBase, table=True):
     google_service_account_file: str | None = Field(default=None, max_length=1024)
     # When the user uploaded the key
     google_service_account_uploaded_at: datetime | None = Field(default=None)
+    # Set by start/stop automation; the midnight planner plans these users
+    automation_enabled: bool = Field(default=False)
+    # Bumped by every stop; runs planned under an older generation are
+    # dropped when a worker picks them up
+    automation_generation: int = Field(default=0)
 
 
 # Properties to return via API, id is always required
@@ -62,6 +109,7 @@ class UserPublic(UserBase):
     id: uuid.UUID
     google_service_account_file: str | None = None
     google_service_account_uploaded_at: datetime | None = None
+    automation_enabled: bool = False
 
 
 class UsersPublic(SQLModel):
@@ -83,6 +131,7 @@ class Token(SQLModel):
 # Contents of JWT token
 class TokenPayload(SQLModel):
     sub: str | None = None
+    scope: str | None = None
 
 
 class NewPassword(SQLModel):
@@ -1,51 +1,66 @@
-import os
 import time
+from collections.abc import Callable
 
 from seleniumbase import BaseCase
 
 from automation.manager.video_manager import VideoManager
 from automation.services.facebook_service import FacebookService
-from automation.services.google_drive_service import GoogleDriveService
 from automation.services.instagram_service import InstagramService
 from automation.services.tiktok_service import TikTokService
 from automation.services.youtube_service import YouTubeService
-from automation.utils.file_utils import FileUtils
 from automation.utils.logging_utils import LoggingUtils, logger
 
 
 class MainApp(BaseCase):
-    def __init__(self, user_id, user_google_credentials: str | None = None):
+    def __init__(
+        self,
+        user_id,
+        on_progress: Callable[..., None] | None = None,
+    ):
         super().__init__()
-        # Allow passing a per-user credentials path which will be used by GoogleDriveService
-        self.google_drive = GoogleDriveService(credentials_path=user_google_credentials)
+        # Called as on_progress(step, progress, platform=None) as the run moves on
+        self.on_progress = on_progress
         self.video_manager = VideoManager()
         self.user_id = str(user_id)
 
     def setUp(self):
         super().setUp()
 
+    def report(self, step: str, progress: int, platform: str | None = None) -> None:
+        if self.on_progress:
+            self.on_progress(step, progress, platform=platform)
+
     def run_for_account(
-        self, sb: BaseCase, drive_folder_id, email, password, platforms, account=None
-    ):
+        self,
+        sb: BaseCase,
+        drive_folder_id,
+        video,
+        video_path,
+        email,
+        password,
+        platforms,
+        account=None,
+    ) -> dict[str, bool]:
+        """
+        Upload ``video`` and return ``{platform: uploaded}``.
+
+        The video was already downloaded to ``video_path`` by the drive-io
+        pool, so the browser slot is only held for the uploads themselves.
+        """
         logger.info(f"Processing account for: {email}")
+        results: dict[str, bool] = {}
         try:
-            video = self.get_video_to_upload(drive_folder_id)
-            if video is None:
-                logger.info("No new videos to upload. Exiting.")
-                return
-
-            video_path = self.download_video(video)
-            if not video_path:
-                return
-
-            self.upload_to_platforms(
+            results = self.upload_to_platforms(
                 sb, video, email, password, video_path, platforms, account
             )
 
             logger.info(f"Finished processing video: {video['name']}")
-            self.video_manager.mark_as_uploaded(
-                video["id"], folder_id=drive_folder_id, user_id=self.user_id
-            ),
+            self.video_manager.load_video_data(drive_folder_id, self.user_id)
+            (
+                self.video_manager.mark_as_uploaded(
+                    video["id"], folder_id=drive_folder_id, user_id=self.user_id
+                ),
+            )
             # self.video_manager.save_video_data()
         except Exception as e:
             logger.error(
@@ -58,33 +73,15 @@ class MainApp(BaseCase):
         # Remove video after uploaded
         self.video_manager.deleted_video(video_path)
         logger.info(f"Deleted video: {video['name']}")
-
-    def get_video_to_upload(self, drive_folder_id):
-        self.video_manager.load_video_data(drive_folder_id, self.user_id)
-        video = self.video_manager.get_next_unuploaded_video()
-        if video is None:
-            logger.info("Fetching new videos from Google Drive")
-            new_videos = self.google_drive.list_videos(drive_folder_id)
-            self.video_manager.update_video_data(
-                new_videos, drive_folder_id, self.user_id
-            )
-            video = self.video_manager.get_next_unuploaded_video()
-        return video
-
-    def download_video(self, video):
-        video_path = FileUtils.get_video_path(video["name"])
-        download_video_path = self.google_drive.download_video(video["id"], video_path)
-        if os.path.exists(download_video_path):
-            logger.info(f"Downloaded video: {video['name']}")
-            return download_video_path
-        else:
-            logger.error(f"Failed to download video: {video['name']}")
-            return None
+        return results
 
     def upload_to_platforms(
         self, sb, video, email, password, video_path, platforms, account=None
-    ):
-        for platform in platforms:
+    ) -> dict[str, bool]:
+        results = {}
+        for index, platform in enumerate(platforms):
+            # Uploads share the 40-90% range of the run's progress
+            self.report("uploading", 40 + 50 * index // len(platforms), platform)
             upload_success = False
             max_retries = 3
             retry_count = 0
@@ -136,6 +133,13 @@ class MainApp(BaseCase):
                 logger.error(
                     f"Failed to upload to {platform.capitalize()} after {max_retries} attempts"
                 )
+            results[platform] = upload_success
+            self.report(
+                "uploaded" if upload_success else "upload_failed",
+                40 + 50 * (index + 1) // len(platforms),
+                platform,
+            )
+        return results
 
     def upload_to_youtube(self, sb, video, email, password, video_path) -> bool:
         youtube = YouTubeService(email, password, user_id=self.user_id)
@@ -27,6 +27,20 @@ class VideoManager:
                 return video
         return None
 
+    def local_path(self, video):
+        """Where ``video`` was downloaded ahead of its run, if still on disk."""
+        path = video.get("local_path")
+        if path and os.path.exists(path):
+            return path
+        return None
+
+    def mark_as_downloaded(self, video_id, video_path, folder_id, user_id):
+        for video in self.video_data:
+            if video["id"] == video_id:
+                video["local_path"] = video_path
+
+        self.save_video_data(folder_id, user_id)
+
     def mark_as_uploaded(self, video_id, folder_id, user_id):
         for video in self.video_data:
             if video["id"] == video_id:
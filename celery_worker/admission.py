@@ -0,0 +1,79 @@
+"""
+Admission control for starting automation.
+
+Before a user's day is planned, the load it would add (accounts x runs x the
+measured task duration) is compared with the browser time still free in the
+user's window, as seen by the ``SlotAllocator``. The start is accepted as is,
+accepted with fewer runs per account, or refused with the first day that has
+room for it.
+"""
+
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+
+import pytz
+from sqlmodel import Session
+
+from app.core.config import settings
+from celery_worker.planner import user_window
+from celery_worker.slots import SlotAllocator, average_task_duration
+
+
+@dataclass
+class Admission:
+    accepted: bool
+    # Runs per account to plan; None keeps the planner's usual range
+    runs: int | None
+    requested_seconds: float
+    free_seconds: float
+    retry_at: datetime | None = None
+
+
+def free_runs(
+    session: Session,
+    plan_date: date,
+    window: tuple[int, int],
+    now: datetime,
+    duration: float,
+) -> float:
+    """Runs of ``duration`` seconds still fitting the user's window on ``plan_date``."""
+    start, end = user_window(plan_date, window, now)
+    if end <= start:
+        return 0.0
+    return SlotAllocator.load(session, start, end, duration).free_capacity(start, end)
+
+
+def admit(
+    session: Session,
+    accounts: int,
+    window: tuple[int, int],
+    now: datetime | None = None,
+) -> Admission:
+    """Decide whether ``accounts`` accounts can be started today."""
+    now = now or datetime.now(pytz.utc)
+    today = now.date()
+    duration = average_task_duration(session)
+    wanted = accounts * settings.AUTOMATION_RUNS_PER_DAY_MAX
+    start, end = user_window(today, window, now)
+    if end <= start:
+        # Today's window is over; the nightly planner takes it from tomorrow
+        return Admission(True, None, wanted * duration, 0.0)
+
+    free = free_runs(session, today, window, now, duration)
+    admission = Admission(True, None, wanted * duration, free * duration)
+    if free >= wanted:
+        return admission
+    runs = int(free // accounts)
+    if runs >= settings.ADMISSION_MIN_RUNS_PER_DAY:
+        admission.runs = runs
+        return admission
+
+    # Suggest the first later day whose window fits the minimum load
+    admission.accepted = False
+    needed = accounts * settings.ADMISSION_MIN_RUNS_PER_DAY
+    for days_ahead in range(1, settings.ADMISSION_LOOKAHEAD_DAYS + 1):
+        day = today + timedelta(days=days_ahead)
+        if free_runs(session, day, window, now, duration) >= needed:
+            admission.retry_at = user_window(day, window, now)[0]
+            break
+    return admission
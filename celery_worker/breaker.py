@@ -0,0 +1,153 @@
+"""
+Per-platform circuit breakers shared by all workers through Redis.
+
+A breaker is ``closed`` while a platform works. After
+``BREAKER_FAILURE_THRESHOLD`` consecutive failed uploads it opens and runs
+leave that platform out for ``BREAKER_COOLDOWN_SECONDS``. Once the cooldown
+has passed it is ``half_open``: a single run is let through as a probe, and
+its outcome either closes the breaker again or re-opens it for another
+cooldown.
+"""
+
+import uuid
+from collections.abc import Iterable
+from datetime import datetime
+
+import pytz
+import redis
+
+from app.core.config import settings
+from app.core.redis import get_redis
+
+PLATFORMS = ("youtube", "tiktok", "instagram", "facebook")
+
+# Returns 0 when the platform must be skipped, 1 when the breaker is closed
+# and 2 when the caller was granted the half-open probe.
+_ALLOW_SCRIPT = """
+local state = redis.call('hget', KEYS[1], 'state') or 'closed'
+if state == 'closed' then
+    return 1
+end
+if state == 'open' then
+    local clock = redis.call('time')
+    local now = tonumber(clock[1]) * 1000 + math.floor(tonumber(clock[2]) / 1000)
+    local opened_at = tonumber(redis.call('hget', KEYS[1], 'opened_at')) or 0
+    if now < opened_at + tonumber(ARGV[1]) then
+        return 0
+    end
+    redis.call('hset', KEYS[1], 'state', 'half_open')
+end
+if redis.call('set', KEYS[2], ARGV[3], 'NX', 'PX', ARGV[2]) then
+    return 2
+end
+return 0
+"""
+_RECORD_SCRIPT = """
+if ARGV[1] == '1' then
+    redis.call('hset', KEYS[1], 'state', 'closed', 'failures', 0)
+    redis.call('del', KEYS[2])
+    return 'closed'
+end
+local state = redis.call('hget', KEYS[1], 'state') or 'closed'
+local failures = redis.call('hincrby', KEYS[1], 'failures', 1)
+if state == 'half_open' or (state == 'closed' and failures >= tonumber(ARGV[2])) then
+    local clock = redis.call('time')
+    local now = tonumber(clock[1]) * 1000 + math.floor(tonumber(clock[2]) / 1000)
+    redis.call('hset', KEYS[1], 'state', 'open', 'opened_at', now)
+    redis.call('del', KEYS[2])
+    return 'open'
+end
+return state
+"""
+_RELEASE_PROBE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+def _keys(platform: str) -> tuple[str, str]:
+    key = f"breaker:platform:{platform}"
+    return key, f"{key}:probe"
+
+
+class PlatformBreaker:
+    """The breakers as seen by one run; remembers the probes it was granted."""
+
+    def __init__(self, client: redis.Redis | None = None) -> None:
+        self.client = client or get_redis()
+        self.token = uuid.uuid4().hex
+        self.probing: set[str] = set()
+
+    def allow(self, platform: str) -> bool:
+        """Whether this run may upload to ``platform``."""
+        verdict = self.client.eval(
+            _ALLOW_SCRIPT,
+            2,
+            *_keys(platform),
+            settings.BREAKER_COOLDOWN_SECONDS * 1000,
+            settings.BREAKER_PROBE_TTL_SECONDS * 1000,
+            self.token,
+        )
+        if int(verdict) == 2:
+            self.probing.add(platform)
+        return bool(verdict)
+
+    def filter(self, platforms: Iterable[str]) -> list[str]:
+        return [platform for platform in platforms if self.allow(platform)]
+
+    def record(self, platform: str, success: bool) -> str:
+        """Feed one upload outcome and return the breaker's new state."""
+        self.probing.discard(platform)
+        state = self.client.eval(
+            _RECORD_SCRIPT,
+            2,
+            *_keys(platform),
+            1 if success else 0,
+            settings.BREAKER_FAILURE_THRESHOLD,
+        )
+        return str(state)
+
+    def release(self) -> None:
+        """Give back probes that were granted but never reported on."""
+        for platform in self.probing:
+            try:
+                self.client.eval(
+                    _RELEASE_PROBE_SCRIPT, 1, _keys(platform)[1], self.token
+                )
+            except redis.RedisError:
+                # The probe key expires on its own
+                pass
+        self.probing.clear()
+
+
+def breaker_states(
+    platforms: Iterable[str] = PLATFORMS, client: redis.Redis | None = None
+) -> list[dict]:
+    """Current state of every platform's breaker, read in one round trip."""
+    client = client or get_redis()
+    platforms = list(platforms)
+    pipe = client.pipeline(transaction=False)
+    for platform in platforms:
+        pipe.hgetall(_keys(platform)[0])
+    cooldown = settings.BREAKER_COOLDOWN_SECONDS
+    states = []
+    for platform, data in zip(platforms, pipe.execute()):
+        opened_at = None
+        retry_at = None
+        if data.get("opened_at"):
+            opened_ts = int(data["opened_at"]) / 1000
+            opened_at = datetime.fromtimestamp(opened_ts, pytz.utc)
+            if data.get("state") == "open":
+                retry_at = datetime.fromtimestamp(opened_ts + cooldown, pytz.utc)
+        states.append(
+            {
+                "platform": platform,
+                "state": data.get("state", "closed"),
+                "failures": int(data.get("failures", 0)),
+                "opened_at": opened_at,
+                "retry_at": retry_at,
+            }
+        )
+    return states
@@ -1,8 +1,13 @@
 import os
 
 from celery import Celery
+from celery.schedules import crontab
+from celery.signals import worker_process_init
 from dotenv import load_dotenv
 
+from app.core.config import settings
+from app.core.db import engine
+
 load_dotenv()
 
 
@@ -23,12 +28,52 @@ celery_worker.conf.update(
     broker_connection_retry_on_startup=True,
     # Optional: You can set the worker name to distinguish multiple workers in Flower
     worker_prefetch_multiplier=1,  # Ensures tasks are executed in order
+    # Browser runs, planning/dispatch and Drive I/O each get their own queue so
+    # a short planning job never waits behind a ten-minute browser session.
+    # Each queue is served by its own worker pool (see services.sh).
+    task_default_queue="planning",
+    task_routes={
+        "celery_worker.task.process_task": {"queue": "browser"},
+        "celery_worker.task.sync_drive_folder": {"queue": "drive-io"},
+        "celery_worker.task.*": {"queue": "planning"},
+    },
 )
 
-# Initially, do not set up any beat_schedule
-celery_worker.conf.beat_schedule = {}
+
+@worker_process_init.connect
+def reset_db_pool(**kwargs) -> None:
+    # Connections inherited from the parent must not be shared with it after
+    # the fork; drop them without closing the parent's sockets
+    engine.dispose(close=False)
+
+
+# Future runs live in the database; beat drives the once-a-day planner that
+# writes them, the dispatcher that hands rows to the broker once they are
+# about to come due, and the daily usertask partition upkeep.
+celery_worker.conf.beat_schedule = {
+    "plan-all-users": {
+        "task": "celery_worker.task.plan_all_users",
+        "schedule": crontab(
+            hour=settings.AUTOMATION_PLANNER_HOUR,
+            minute=settings.AUTOMATION_PLANNER_MINUTE,
+        ),
+    },
+    "maintain-usertask-partitions": {
+        "task": "celery_worker.task.maintain_usertask_partitions",
+        "schedule": crontab(hour=settings.USERTASK_MAINTENANCE_HOUR, minute=0),
+    },
+    "dispatch-due-tasks": {
+        "task": "celery_worker.task.dispatch_due_tasks",
+        "schedule": settings.DISPATCH_INTERVAL_SECONDS,
+        # A poll that could not run in time is superseded by the next one
+        "options": {"expires": settings.DISPATCH_INTERVAL_SECONDS},
+    },
+}
 
 __all__ = ["celery_worker"]
 # uvicorn app.main:app --host 0.0.0.0 --port 8000 --reload
-# celery -A celery_worker.celery_worker worker --loglevel=info
+# celery -A celery_worker.celery_worker worker -Q browser -c 4 -O fair --loglevel=info
+# celery -A celery_worker.celery_worker worker -Q planning -P threads -c 4 --loglevel=info
+# celery -A celery_worker.celery_worker worker -Q drive-io -P threads -c 8 --loglevel=info
+# celery -A celery_worker.celery_worker beat --loglevel=info
 # celery -A celery_worker.celery_worker flower
@@ -0,0 +1,82 @@
+"""
+Progress of background task-history deletions.
+
+``delete_user_tasks`` clears a user's history in batches on the planning
+queue and keeps a small Redis hash per user, ``cleanup:tasks:<user_id>``,
+with the rows to delete, the rows deleted so far and the job's state. The
+API reads it to report progress and to refuse a second job while one runs.
+"""
+
+import uuid
+from datetime import datetime
+
+import pytz
+import redis
+
+from app.core.redis import get_redis
+
+# Progress of a job stays readable for a day; this also bounds how long a
+# job whose worker died keeps blocking new ones
+PROGRESS_TTL_SECONDS = 24 * 3600
+
+# Replace the previous job's progress unless that job is still running
+_START_SCRIPT = """
+if redis.call('hget', KEYS[1], 'status') == 'running' then
+    return 0
+end
+redis.call('del', KEYS[1])
+redis.call('hset', KEYS[1], 'status', 'running', 'total', ARGV[1],
+           'deleted', 0, 'started_at', ARGV[2])
+redis.call('expire', KEYS[1], ARGV[3])
+return 1
+"""
+
+
+def progress_key(user_id: uuid.UUID | str) -> str:
+    return f"cleanup:tasks:{user_id}"
+
+
+def start_progress(
+    user_id: uuid.UUID | str, total: int, client: redis.Redis | None = None
+) -> bool:
+    """Record a new job for the user; False if one is already running."""
+    started = (client or get_redis()).eval(
+        _START_SCRIPT,
+        1,
+        progress_key(user_id),
+        total,
+        datetime.now(pytz.utc).isoformat(),
+        PROGRESS_TTL_SECONDS,
+    )
+    return bool(started)
+
+
+def record_progress(
+    user_id: uuid.UUID | str, deleted: int, client: redis.Redis | None = None
+) -> None:
+    (client or get_redis()).hincrby(progress_key(user_id), "deleted", deleted)
+
+
+def finish_progress(
+    user_id: uuid.UUID | str, status: str, client: redis.Redis | None = None
+) -> None:
+    (client or get_redis()).hset(
+        progress_key(user_id),
+        mapping={"status": status, "finished_at": datetime.now(pytz.utc).isoformat()},
+    )
+
+
+def read_progress(
+    user_id: uuid.UUID | str, client: redis.Redis | None = None
+) -> dict | None:
+    """The user's latest job as a dict, or None if there was none recently."""
+    progress = (client or get_redis()).hgetall(progress_key(user_id))
+    if not progress:
+        return None
+    return {
+        "status": progress.get("status"),
+        "total": int(progress.get("total", 0)),
+        "deleted": int(progress.get("deleted", 0)),
+        "started_at": progress.get("started_at"),
+        "finished_at": progress.get("finished_at"),
+    }
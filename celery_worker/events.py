@@ -0,0 +1,59 @@
+"""
+Live progress of runs, pushed to the automation page.
+
+Workers publish a small JSON event on the owner's Redis pub/sub channel
+whenever a run changes state or moves to another step; the API relays the
+channel to open pages as Server-Sent Events. Pub/sub keeps nothing: a page
+that was closed reloads the current state from the status endpoint, and
+events published while nobody listens cost a single PUBLISH.
+"""
+
+import json
+import uuid
+from datetime import datetime
+
+import pytz
+import redis
+
+from app.core.redis import get_redis
+from app.models.task_model import TaskStatus
+from automation.utils.logging_utils import logger
+
+
+def user_channel(user_id: uuid.UUID | str) -> str:
+    return f"events:user:{user_id}"
+
+
+def publish_task_event(
+    user_id: uuid.UUID | str,
+    task_id: uuid.UUID | str,
+    status: TaskStatus,
+    *,
+    progress: int | None = None,
+    step: str | None = None,
+    platform: str | None = None,
+    error: str | None = None,
+    client: redis.Redis | None = None,
+) -> None:
+    """
+    Tell the user's open pages that ``task_id`` moved on.
+
+    Best effort: a Redis error is logged and the run carries on, since the
+    database row stays the source of truth.
+    """
+    event = {
+        "task_id": str(task_id),
+        "status": status.value,
+        "progress": progress,
+        "step": step,
+        "platform": platform,
+        "error": error,
+        "at": datetime.now(pytz.utc).isoformat(),
+    }
+    payload = json.dumps(
+        {key: value for key, value in event.items() if value is not None}
+    )
+    try:
+        (client or get_redis()).publish(user_channel(user_id), payload)
+    except redis.RedisError:
+        logger.warning("Failed to publish progress of task %s", task_id)
@@ -0,0 +1,150 @@
+"""
+Weighted fair dispatch across users.
+
+Every user's due PENDING rows form a virtual queue. Each dispatcher tick
+hands out at most the browser slots that are free, split between the
+backlogged users by deficit round robin: every round a user earns
+``dispatch_weight`` credits and spends one per run, so under contention users
+get slots in proportion to their weight however long their queue is.
+Deficits carry over between ticks in a Redis hash, and a user is never given
+more than their ``max_concurrent_tasks`` runs in flight. Ticks only apply
+the change they made to each deficit, with HINCRBYFLOAT, so two ticks that
+overlap never overwrite each other's credits.
+"""
+
+import uuid
+from collections.abc import Mapping
+from datetime import datetime, timedelta
+
+import redis
+from sqlmodel import Session, col, func, or_, select
+
+from app import crud
+from app.core.config import settings
+from app.core.redis import get_redis
+from app.models.task_model import TaskStatus, UserTask
+from app.models.user_model import User
+
+DEFICITS_KEY = "dispatch:deficits"
+
+# Smallest weight a round earns; the user table enforces it too, but a weight
+# that is zero or less would never let the round finish
+MIN_DISPATCH_WEIGHT = 0.1
+
+
+def in_flight_by_user(session: Session, now: datetime) -> dict[uuid.UUID, int]:
+    """Runs handed to the broker or running, per user."""
+    stale_before = now - timedelta(seconds=settings.TASK_STALE_AFTER_SECONDS)
+    statement = (
+        select(UserTask.user_id, func.count())
+        .where(crud.live_task_window(now))
+        .where(
+            or_(
+                UserTask.status == TaskStatus.QUEUED,
+                (UserTask.status == TaskStatus.PROCESSING)
+                & (col(UserTask.started_at) >= stale_before),
+            )
+        )
+        .group_by(UserTask.user_id)
+    )
+    return {user_id: count for user_id, count in session.exec(statement)}
+
+
+def due_backlog(session: Session, due_before: datetime, now: datetime) -> list:
+    """``(user_id, due, dispatch_weight, max_concurrent_tasks)`` per backlogged user."""
+    statement = (
+        select(
+            UserTask.user_id,
+            func.count(),
+            User.dispatch_weight,
+            User.max_concurrent_tasks,
+        )
+        .join(User, col(User.id) == UserTask.user_id)
+        .where(crud.live_task_window(now))
+        .where(UserTask.status == TaskStatus.PENDING)
+        .where(UserTask.scheduled_time <= due_before)
+        # Runs of paused accounts are not backlog: they cannot be claimed
+        .where(crud.account_not_paused())
+        .group_by(UserTask.user_id, User.dispatch_weight, User.max_concurrent_tasks)
+    )
+    return session.exec(statement).all()
+
+
+def deficit_round_robin(
+    demand: Mapping[uuid.UUID, int],
+    weights: Mapping[uuid.UUID, float],
+    deficits: Mapping[uuid.UUID, float],
+    budget: int,
+) -> tuple[dict[uuid.UUID, int], dict[uuid.UUID, float]]:
+    """
+    Split ``budget`` runs between users wanting ``demand`` runs each.
+
+    Returns the runs granted per user and the deficits to carry into the next
+    tick. Users with no demand left are dropped so idle users cannot bank
+    credit.
+    """
+    demand = {user_id: n for user_id, n in demand.items() if n > 0}
+    deficits = {user_id: deficits.get(user_id, 0.0) for user_id in demand}
+    granted = dict.fromkeys(demand, 0)
+    active = list(demand)
+    while budget > 0 and active:
+        for user_id in active:
+            deficits[user_id] += max(weights[user_id], MIN_DISPATCH_WEIGHT)
+        # Users owed the most go first, so a budget that runs out mid-round
+        # favours whoever was cut short last time
+        for user_id in sorted(active, key=deficits.__getitem__, reverse=True):
+            take = min(int(deficits[user_id]), demand[user_id], budget)
+            granted[user_id] += take
+            demand[user_id] -= take
+            deficits[user_id] -= take
+            budget -= take
+            if not budget:
+                break
+        active = [user_id for user_id in active if demand[user_id] > 0]
+    carried = {user_id: deficits[user_id] for user_id in demand if demand[user_id] > 0}
+    return {user_id: n for user_id, n in granted.items() if n}, carried
+
+
+def fair_allocation(
+    session: Session,
+    due_before: datetime,
+    now: datetime,
+    client: redis.Redis | None = None,
+) -> dict[uuid.UUID, int]:
+    """How many due runs to claim for each user on this tick."""
+    in_flight = in_flight_by_user(session, now)
+    budget = min(
+        settings.BROWSER_SLOTS - sum(in_flight.values()), settings.DISPATCH_BATCH_SIZE
+    )
+    if budget <= 0:
+        return {}
+
+    demand: dict[uuid.UUID, int] = {}
+    weights: dict[uuid.UUID, float] = {}
+    for user_id, due, weight, cap in due_backlog(session, due_before, now):
+        headroom = due if cap is None else cap - in_flight.get(user_id, 0)
+        demand[user_id] = min(due, headroom)
+        weights[user_id] = weight
+    if not demand:
+        return {}
+
+    client = client or get_redis()
+    stored = client.hgetall(DEFICITS_KEY)
+    deficits = {
+        uuid.UUID(user_id): max(float(value), 0.0) for user_id, value in stored.items()
+    }
+    granted, carried = deficit_round_robin(demand, weights, deficits, budget)
+
+    # Apply only this tick's change to each deficit; what an overlapping tick
+    # wrote since the read above is kept
+    pipe = client.pipeline()
+    for user_id, value in carried.items():
+        change = value - deficits.get(user_id, 0.0)
+        if change:
+            pipe.hincrbyfloat(DEFICITS_KEY, str(user_id), change)
+    # Users without demand left stop banking credit
+    dropped = [str(user_id) for user_id in deficits if user_id not in carried]
+    if dropped:
+        pipe.hdel(DEFICITS_KEY, *dropped)
+    pipe.execute()
+    return granted
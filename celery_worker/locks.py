@@ -0,0 +1,81 @@
+"""
+Per-account execution lease backed by Redis.
+
+Only one ``process_task`` may drive a given account at a time; two browsers on
+the same cookies and ``video_data.json`` usually both fail. The lease is a
+``SET NX PX`` key holding a random token, renewed by a heartbeat thread while
+the run is alive and left to expire if the worker dies.
+"""
+
+import threading
+import uuid
+
+import redis
+
+from app.core.config import settings
+from app.core.redis import get_redis
+
+# Only the holder's token may extend or delete the key
+_RENEW_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('pexpire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+_RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+class AccountLease:
+    def __init__(
+        self,
+        account_id: uuid.UUID | str,
+        ttl_seconds: int | None = None,
+        client: redis.Redis | None = None,
+    ) -> None:
+        self.key = f"lease:account:{account_id}"
+        self.token = uuid.uuid4().hex
+        self.ttl_ms = (ttl_seconds or settings.ACCOUNT_LEASE_TTL_SECONDS) * 1000
+        self.client = client or get_redis()
+        self._stop = threading.Event()
+        self._heartbeat: threading.Thread | None = None
+
+    def acquire(self) -> bool:
+        """Take the lease and start renewing it; False if another run holds it."""
+        if not self.client.set(self.key, self.token, nx=True, px=self.ttl_ms):
+            return False
+        self._heartbeat = threading.Thread(
+            target=self._renew_until_stopped, name=f"{self.key}-heartbeat", daemon=True
+        )
+        self._heartbeat.start()
+        return True
+
+    def renew(self) -> bool:
+        return bool(
+            self.client.eval(_RENEW_SCRIPT, 1, self.key, self.token, self.ttl_ms)
+        )
+
+    def release(self) -> None:
+        self._stop.set()
+        if self._heartbeat is not None:
+            self._heartbeat.join(timeout=5)
+            self._heartbeat = None
+        try:
+            self.client.eval(_RELEASE_SCRIPT, 1, self.key, self.token)
+        except redis.RedisError:
+            # The key expires on its own; nothing else to clean up
+            pass
+
+    def _renew_until_stopped(self) -> None:
+        interval = self.ttl_ms / 3000
+        while not self._stop.wait(interval):
+            try:
+                if not self.renew():
+                    # Lost the lease (expired during a stall); stop renewing
+                    return
+            except redis.RedisError:
+                continue
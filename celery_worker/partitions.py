@@ -0,0 +1,155 @@
+"""
+Monthly partitions of ``usertask``.
+
+The table is range-partitioned on ``created_at``, one partition per month
+named ``usertask_pYYYY_MM``. ``ensure_partitions`` creates the months ahead;
+should inserts outrun it anyway, rows land in ``usertask_default`` instead of
+failing, and are moved into their month once it is created.
+``retire_partitions`` detaches months that fall entirely outside the
+retention window and either drops them or moves them, stripped of indexes
+and foreign keys, into the archive schema.
+"""
+
+from datetime import date
+
+from sqlalchemy import text
+from sqlmodel import Session
+
+from automation.utils.logging_utils import logger
+
+PARENT = "usertask"
+DEFAULT_PARTITION = f"{PARENT}_default"
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{PARENT}_p{month:%Y_%m}"
+
+
+def attached_partitions(session: Session) -> dict[str, date]:
+    """Attached partitions keyed by name, with the month each one holds."""
+    rows = session.execute(
+        text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE parent.relname = :parent"
+        ),
+        {"parent": PARENT},
+    )
+    partitions = {}
+    for (name,) in rows:
+        if name == DEFAULT_PARTITION:
+            continue
+        year, month = name.removeprefix(f"{PARENT}_p").split("_")
+        partitions[name] = date(int(year), int(month), 1)
+    return partitions
+
+
+def ensure_partitions(session: Session, today: date, months_ahead: int) -> list[str]:
+    """Create the partitions from this month to ``months_ahead`` months out."""
+    existing = attached_partitions(session)
+    this_month = today.replace(day=1)
+    created = []
+    for offset in range(months_ahead + 1):
+        month = add_months(this_month, offset)
+        name = partition_name(month)
+        if name in existing:
+            continue
+        moved = create_partition(session, month)
+        if moved:
+            logger.warning(
+                "Moved %d usertask rows from %s into %s",
+                moved,
+                DEFAULT_PARTITION,
+                name,
+            )
+        # One partition per transaction keeps the parent's lock short
+        session.commit()
+        created.append(name)
+    return created
+
+
+def create_partition(session: Session, month: date) -> int:
+    """
+    Add the partition for ``month``; return the rows moved out of the default.
+
+    A month cannot be attached while the default partition holds rows of it,
+    so the table is built on its own, filled with those rows and attached.
+    """
+    name = partition_name(month)
+    end = add_months(month, 1)
+    session.execute(
+        text(
+            f"CREATE TABLE {name} "
+            f"(LIKE {PARENT} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+        )
+    )
+    moved = session.execute(
+        text(
+            f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} "
+            "WHERE created_at >= :start AND created_at < :end RETURNING *) "
+            f"INSERT INTO {name} SELECT * FROM moved"
+        ),
+        {"start": month, "end": end},
+    ).rowcount
+    session.execute(
+        text(
+            f"ALTER TABLE {PARENT} ATTACH PARTITION {name} "
+            f"FOR VALUES FROM ('{month}') TO ('{end}')"
+        )
+    )
+    return moved
+
+
+def retire_partitions(
+    session: Session, cutoff: date, archive_schema: str | None
+) -> list[str]:
+    """
+    Detach every partition whose month ends on or before ``cutoff``.
+
+    With ``archive_schema`` the detached tables are moved there and reduced to
+    their primary key, so they stay queryable without costing index upkeep or
+    blocking deletes of users and accounts; without it they are dropped.
+    """
+    retired = []
+    for name, month in sorted(attached_partitions(session).items()):
+        if add_months(month, 1) > cutoff:
+            continue
+        session.execute(text(f"ALTER TABLE {PARENT} DETACH PARTITION {name}"))
+        if archive_schema:
+            compact_archive(session, name, archive_schema)
+        else:
+            session.execute(text(f"DROP TABLE {name}"))
+        # One partition per transaction keeps the parent's lock short
+        session.commit()
+        retired.append(name)
+    return retired
+
+
+def compact_archive(session: Session, name: str, archive_schema: str) -> None:
+    session.execute(text(f"CREATE SCHEMA IF NOT EXISTS {archive_schema}"))
+    session.execute(text(f"ALTER TABLE {name} SET SCHEMA {archive_schema}"))
+    table = f"{archive_schema}.{name}"
+    foreign_keys = session.execute(
+        text(
+            "SELECT conname FROM pg_constraint "
+            "WHERE conrelid = CAST(:table AS regclass) AND contype = 'f'"
+        ),
+        {"table": table},
+    ).scalars()
+    for constraint in list(foreign_keys):
+        session.execute(text(f'ALTER TABLE {table} DROP CONSTRAINT "{constraint}"'))
+    indexes = session.execute(
+        text(
+            "SELECT indexrelid::regclass::text FROM pg_index "
+            "WHERE indrelid = CAST(:table AS regclass) AND NOT indisprimary"
+        ),
+        {"table": table},
+    ).scalars()
+    for index in list(indexes):
+        session.execute(text(f"DROP INDEX {index}"))
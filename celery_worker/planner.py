@@ -0,0 +1,263 @@
+"""
+Daily automation planning.
+
+A user's day is planned at most once: the planner claims the
+``(user_id, plan_date)`` row in ``automationplan`` and only the caller that wins
+that insert writes the day's UserTask rows. Repeated or overlapping planning
+requests for the same day are therefore no-ops.
+
+``plan_user_day`` plans a single user when automation is started;
+``plan_all_users_day`` is the once-a-day pass over every enabled user. Start
+times come from the load-aware ``SlotAllocator`` rather than random minutes.
+"""
+
+import random
+import uuid
+from collections import defaultdict
+from collections.abc import Mapping, Sequence
+from datetime import date, datetime, time, timedelta
+
+import pytz
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import Session, col, select, update
+
+from app import crud
+from app.core.config import settings
+from app.models.account_model import Account
+from app.models.task_model import AutomationPlan, TaskStatus, UserTaskCreate
+from app.models.user_model import User
+from automation.utils.logging_utils import logger
+from celery_worker.slots import SlotAllocator
+
+
+def claim_plans(
+    session: Session, runs_by_user: Mapping[uuid.UUID, int], plan_date: date
+) -> dict[uuid.UUID, int]:
+    """
+    Insert plan rows for ``plan_date`` in one statement.
+
+    Returns ``{user_id: runs}`` for the users whose day was not planned yet;
+    users that already have a plan row are left out.
+    """
+    if not runs_by_user:
+        return {}
+    created_at = datetime.now(pytz.utc)
+    rows = [
+        {
+            "id": uuid.uuid4(),
+            "user_id": user_id,
+            "plan_date": plan_date,
+            "runs": runs,
+            "created_at": created_at,
+        }
+        for user_id, runs in runs_by_user.items()
+    ]
+    statement = (
+        insert(AutomationPlan)
+        .on_conflict_do_nothing(constraint="uq_automationplan_user_date")
+        .returning(AutomationPlan.user_id, AutomationPlan.runs)
+    )
+    return {row.user_id: row.runs for row in session.execute(statement, rows)}
+
+
+def lock_generations(
+    session: Session, user_ids: Sequence[uuid.UUID]
+) -> dict[uuid.UUID, int]:
+    """
+    Automation generation of each user in ``user_ids`` that is still enabled.
+
+    The user rows stay locked FOR SHARE until the plan commits, so a
+    concurrent stop, which bumps the generation, waits for the new tasks to
+    exist and then stops them along with the rest.
+    """
+    if not user_ids:
+        return {}
+    statement = (
+        select(User.id, User.automation_generation)
+        .where(col(User.id).in_(user_ids), User.automation_enabled)
+        .with_for_update(read=True)
+    )
+    return {row.id: row.automation_generation for row in session.exec(statement)}
+
+
+def user_window(
+    plan_date: date, window: tuple[int, int], now: datetime
+) -> tuple[datetime, datetime]:
+    """The part of the user's daily window ``[start_hour, end_hour)`` still ahead."""
+    day_start = datetime.combine(plan_date, time.min, tzinfo=pytz.utc)
+    start_hour, end_hour = window
+    return (
+        max(day_start + timedelta(hours=start_hour), now),
+        day_start + timedelta(hours=end_hour),
+    )
+
+
+def allocate_runs(
+    allocator: SlotAllocator,
+    accounts: Sequence[Account],
+    runs: int,
+    start: datetime,
+    end: datetime,
+) -> list[tuple[Account, datetime]]:
+    """
+    Place ``runs`` rounds of every account inside ``[start, end)``.
+
+    The window is split into one segment per round so runs stay spread over
+    the day, and each account's run goes to the least-loaded bucket of its
+    segment.
+    """
+    if runs <= 0 or end <= start:
+        return []
+    segment = (end - start) / runs
+    placements = []
+    for run in range(runs):
+        segment_start = start + run * segment
+        for account in accounts:
+            scheduled_time = allocator.place(segment_start, segment_start + segment)
+            if scheduled_time is not None:
+                placements.append((account, scheduled_time))
+    return placements
+
+
+def build_tasks(
+    user_id: uuid.UUID,
+    placements: Sequence[tuple[Account, datetime]],
+    generation: int = 0,
+) -> list[UserTaskCreate]:
+    """One pending task per placed (account, scheduled_time)."""
+    expiry = timedelta(seconds=settings.TASK_EXPIRY_SECONDS)
+    return [
+        UserTaskCreate(
+            title=f"Automation for account {account.email}",
+            user_id=user_id,
+            account_id=account.id,
+            status=TaskStatus.PENDING,
+            task_id=str(uuid.uuid4()),
+            scheduled_time=scheduled_time,
+            expires_at=scheduled_time + expiry,
+            generation=generation,
+        )
+        for account, scheduled_time in placements
+    ]
+
+
+def plan_users_day(
+    session: Session,
+    accounts_by_user: Mapping[uuid.UUID, Sequence[Account]],
+    plan_date: date,
+    runs: int | None = None,
+    windows: Mapping[uuid.UUID, tuple[int, int]] | None = None,
+) -> int:
+    """
+    Plan ``plan_date`` for many users at once and return the tasks created.
+
+    Plans are claimed with a single insert and all tasks are written with a
+    single bulk insert, in one transaction. Each user gets the runs asked
+    for, or fewer when the browser time left in their window cannot take
+    them; the plan row records what was planned. Users without accounts, with
+    automation stopped or whose day is already planned are skipped. Tasks
+    are stamped with their user's current automation generation. ``windows``
+    maps users to their ``(start_hour, end_hour)``; users not in it may run
+    all day.
+    """
+    generations = lock_generations(
+        session, [user_id for user_id, accounts in accounts_by_user.items() if accounts]
+    )
+    runs_by_user = {
+        user_id: runs
+        or random.randint(
+            settings.AUTOMATION_RUNS_PER_DAY_MIN, settings.AUTOMATION_RUNS_PER_DAY_MAX
+        )
+        for user_id in generations
+    }
+    claimed = claim_plans(session, runs_by_user, plan_date)
+    if not claimed:
+        session.rollback()
+        return 0
+
+    day_start = datetime.combine(plan_date, time.min, tzinfo=pytz.utc)
+    allocator = SlotAllocator.load(session, day_start, day_start + timedelta(days=1))
+    now = datetime.now(pytz.utc)
+    windows = windows or {}
+
+    # Shuffle so no user consistently gets first pick of the quiet buckets
+    user_ids = list(claimed)
+    random.shuffle(user_ids)
+    tasks_in = []
+    for user_id in user_ids:
+        accounts = accounts_by_user[user_id]
+        start, end = user_window(plan_date, windows.get(user_id, (0, 24)), now)
+        # Never book more than the browsers can still run in the window, as
+        # admission does on start; the users placed first may use it up
+        fitting = int(allocator.free_capacity(start, end) // len(accounts))
+        runs_per_account = min(claimed[user_id], fitting)
+        if runs_per_account < claimed[user_id]:
+            logger.warning(
+                "Planning %d of %d runs per account for user %s on %s: "
+                "no browser capacity left for more",
+                runs_per_account,
+                claimed[user_id],
+                user_id,
+                plan_date,
+            )
+            session.execute(
+                update(AutomationPlan)
+                .where(col(AutomationPlan.user_id) == user_id)
+                .where(col(AutomationPlan.plan_date) == plan_date)
+                .values(runs=runs_per_account)
+            )
+        placements = allocate_runs(allocator, accounts, runs_per_account, start, end)
+        tasks_in.extend(build_tasks(user_id, placements, generations[user_id]))
+
+    # The plan rows and their tasks commit together
+    created = crud.create_tasks(session=session, tasks_in=tasks_in)
+    if not created:
+        session.commit()
+    return len(created)
+
+
+def plan_user_day(
+    session: Session,
+    user_id: uuid.UUID,
+    plan_date: date,
+    runs: int | None = None,
+) -> int:
+    """
+    Plan ``plan_date`` for one user and return the number of tasks created.
+
+    Returns 0 without touching UserTask when the user has no accounts, has
+    stopped automation or the day has already been planned.
+    """
+    user = session.get(User, user_id)
+    if not user:
+        return 0
+    accounts = session.exec(select(Account).where(Account.owner_id == user_id)).all()
+    window = (user.automation_window_start, user.automation_window_end)
+    return plan_users_day(
+        session, {user_id: accounts}, plan_date, runs, windows={user_id: window}
+    )
+
+
+def plan_all_users_day(session: Session, plan_date: date) -> int:
+    """Plan ``plan_date`` for every active user with automation enabled."""
+    statement = (
+        select(
+            Account.id,
+            Account.owner_id,
+            Account.email,
+            User.automation_window_start,
+            User.automation_window_end,
+        )
+        .join(User, col(User.id) == Account.owner_id)
+        .where(User.is_active, User.automation_enabled)
+        .order_by(Account.owner_id, Account.email)
+    )
+    accounts_by_user: dict[uuid.UUID, list] = defaultdict(list)
+    windows: dict[uuid.UUID, tuple[int, int]] = {}
+    for account in session.exec(statement):
+        accounts_by_user[account.owner_id].append(account)
+        windows[account.owner_id] = (
+            account.automation_window_start,
+            account.automation_window_end,
+        )
+    return plan_users_day(session, accounts_by_user, plan_date, windows=windows)
@@ -0,0 +1,106 @@
+"""
+Cluster-wide upload rate limits backed by Redis.
+
+Every platform has a token bucket shared by all workers; a run may also be
+charged against per-account and per-egress-IP buckets. A run takes one token
+from every bucket it touches or from none of them: the check and the
+decrement happen in a single Lua script, so two workers can never both spend
+the last token.
+"""
+
+import uuid
+from collections.abc import Iterable
+
+import redis
+
+from app.core.config import settings
+from app.core.redis import get_redis
+
+# KEYS are bucket keys; ARGV holds (refill per ms, capacity) for each key.
+# Returns 0 when a token was taken from every bucket, otherwise the number of
+# milliseconds until the emptiest bucket has a token again.
+_ACQUIRE_SCRIPT = """
+local clock = redis.call('time')
+local now = tonumber(clock[1]) * 1000 + math.floor(tonumber(clock[2]) / 1000)
+local levels = {}
+local wait = 0
+for i, key in ipairs(KEYS) do
+    local rate = tonumber(ARGV[2 * i - 1])
+    local capacity = tonumber(ARGV[2 * i])
+    local state = redis.call('hmget', key, 'tokens', 'ts')
+    local tokens = tonumber(state[1]) or capacity
+    local ts = tonumber(state[2]) or now
+    tokens = math.min(capacity, tokens + math.max(now - ts, 0) * rate)
+    levels[i] = tokens
+    if tokens < 1 then
+        wait = math.max(wait, math.ceil((1 - tokens) / rate))
+    end
+end
+if wait > 0 then
+    return wait
+end
+for i, key in ipairs(KEYS) do
+    local rate = tonumber(ARGV[2 * i - 1])
+    local capacity = tonumber(ARGV[2 * i])
+    redis.call('hset', key, 'tokens', tostring(levels[i] - 1), 'ts', now)
+    redis.call('pexpire', key, math.ceil(capacity / rate) + 1000)
+end
+return 0
+"""
+
+_MS_PER_HOUR = 3600 * 1000
+
+
+class UploadRateLimiter:
+    def __init__(self, client: redis.Redis | None = None) -> None:
+        self.client = client or get_redis()
+
+    def buckets(
+        self, platforms: Iterable[str], account_id: uuid.UUID | str | None = None
+    ) -> list[tuple[str, float, int]]:
+        """``(key, refill per ms, capacity)`` of every bucket a run is charged to."""
+        burst = settings.PLATFORM_UPLOAD_BURST
+        buckets = []
+        for platform in platforms:
+            per_hour = settings.PLATFORM_UPLOADS_PER_HOUR.get(platform)
+            if per_hour:
+                buckets.append(
+                    (f"ratelimit:platform:{platform}", per_hour / _MS_PER_HOUR, burst)
+                )
+            if account_id and settings.ACCOUNT_UPLOADS_PER_HOUR:
+                buckets.append(
+                    (
+                        f"ratelimit:platform:{platform}:account:{account_id}",
+                        settings.ACCOUNT_UPLOADS_PER_HOUR / _MS_PER_HOUR,
+                        1,
+                    )
+                )
+            if settings.EGRESS_ID and settings.EGRESS_UPLOADS_PER_HOUR:
+                buckets.append(
+                    (
+                        f"ratelimit:platform:{platform}:egress:{settings.EGRESS_ID}",
+                        settings.EGRESS_UPLOADS_PER_HOUR / _MS_PER_HOUR,
+                        burst,
+                    )
+                )
+        return buckets
+
+    def acquire(
+        self, platforms: Iterable[str], account_id: uuid.UUID | str | None = None
+    ) -> float:
+        """
+        Spend one upload on every platform of a run.
+
+        Returns 0 when the run may go ahead, otherwise the number of seconds
+        to wait before the budget allows it; nothing is spent in that case.
+        """
+        buckets = self.buckets(platforms, account_id)
+        if not buckets:
+            return 0.0
+        args: list[float | int] = []
+        for _, rate, capacity in buckets:
+            args.extend((rate, capacity))
+        wait_ms = self.client.eval(
+            _ACQUIRE_SCRIPT, len(buckets), *(key for key, _, _ in buckets), *args
+        )
+        return int(wait_ms) / 1000
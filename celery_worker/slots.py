@@ -0,0 +1,131 @@
+"""
+Load-aware slot allocation for planned runs.
+
+The day is cut into fixed-size buckets. Each bucket can absorb roughly
+``BROWSER_SLOTS * bucket_seconds / average_task_duration`` runs; the allocator
+starts from what other users already booked and places every new run into the
+least-loaded bucket of the window it is allowed to use.
+"""
+
+import random
+from datetime import datetime, timedelta
+
+import pytz
+from sqlmodel import Session, col, func, select
+
+from app.core.config import settings
+from app.models.task_model import TaskStatus, UserTask
+
+# Statuses that still occupy a browser slot at their scheduled time
+BOOKED_STATUSES = (TaskStatus.PENDING, TaskStatus.QUEUED, TaskStatus.PROCESSING)
+
+
+def average_task_duration(session: Session) -> float:
+    """
+    Mean wall time of recently finished runs, in seconds.
+
+    Callers that need it more than once should compute it once and pass it
+    on: this aggregates a whole window of history.
+    """
+    since = datetime.now(pytz.utc) - timedelta(days=settings.TASK_DURATION_WINDOW_DAYS)
+    # A run finishes within the live window of its creation, so the bound on
+    # created_at loses no row and keeps the scan off older partitions
+    created_since = since - timedelta(hours=settings.TASK_LIVE_MAX_AGE_HOURS)
+    statement = select(
+        func.avg(
+            func.extract("epoch", col(UserTask.finished_at) - col(UserTask.started_at))
+        )
+    ).where(
+        col(UserTask.created_at) >= created_since,
+        col(UserTask.started_at).is_not(None),
+        col(UserTask.finished_at) >= since,
+    )
+    measured = session.exec(statement).one()
+    if not measured or measured <= 0:
+        return float(settings.DEFAULT_TASK_DURATION_SECONDS)
+    return float(measured)
+
+
+def booked_buckets(
+    session: Session, start: datetime, end: datetime, bucket_seconds: int
+) -> dict[int, int]:
+    """Count runs already booked in ``[start, end)``, keyed by bucket index."""
+    bucket = func.floor(
+        func.extract("epoch", col(UserTask.scheduled_time)) / bucket_seconds
+    )
+    statement = (
+        select(bucket, func.count())
+        .where(col(UserTask.status).in_(BOOKED_STATUSES))
+        .where(col(UserTask.scheduled_time) >= start)
+        .where(col(UserTask.scheduled_time) < end)
+        .group_by(bucket)
+    )
+    return {int(index): count for index, count in session.exec(statement)}
+
+
+class SlotAllocator:
+    """Tracks booked capacity per time bucket and hands out start times."""
+
+    def __init__(
+        self, bucket_seconds: int, capacity: float, booked: dict[int, int]
+    ) -> None:
+        self.bucket_seconds = bucket_seconds
+        self.capacity = capacity
+        self.booked = booked
+
+    @classmethod
+    def load(
+        cls,
+        session: Session,
+        start: datetime,
+        end: datetime,
+        duration: float | None = None,
+    ) -> "SlotAllocator":
+        """
+        Build an allocator from current bookings between ``start`` and ``end``.
+
+        ``duration`` is the average run time, measured here when not given.
+        """
+        bucket_seconds = settings.SLOT_BUCKET_MINUTES * 60
+        if duration is None:
+            duration = average_task_duration(session)
+        capacity = max(settings.BROWSER_SLOTS * bucket_seconds / duration, 1.0)
+        return cls(
+            bucket_seconds,
+            capacity,
+            booked_buckets(session, start, end, bucket_seconds),
+        )
+
+    def _bucket_range(self, start: datetime, end: datetime) -> range:
+        first = int(start.timestamp() // self.bucket_seconds)
+        last = int((end.timestamp() - 1) // self.bucket_seconds)
+        return range(first, last + 1)
+
+    def place(self, start: datetime, end: datetime) -> datetime | None:
+        """
+        Book one run in the least-loaded bucket of ``[start, end)``.
+
+        Ties are broken randomly so runs don't all pile into the first free
+        bucket. Returns None when the window is empty.
+        """
+        buckets = self._bucket_range(start, end)
+        if not buckets:
+            return None
+        lowest = min(self.booked.get(index, 0) for index in buckets)
+        choice = random.choice(
+            [index for index in buckets if self.booked.get(index, 0) == lowest]
+        )
+        self.booked[choice] = self.booked.get(choice, 0) + 1
+
+        bucket_start = datetime.fromtimestamp(choice * self.bucket_seconds, pytz.utc)
+        earliest = max(bucket_start, start)
+        latest = min(bucket_start + timedelta(seconds=self.bucket_seconds), end)
+        jitter = random.uniform(0, (latest - earliest).total_seconds())
+        return earliest + timedelta(seconds=jitter)
+
+    def free_capacity(self, start: datetime, end: datetime) -> float:
+        """Runs that still fit in ``[start, end)`` without overbooking."""
+        return sum(
+            max(self.capacity - self.booked.get(index, 0), 0.0)
+            for index in self._bucket_range(start, end)
+        )
@@ -1,6 +1,7 @@
-import random
 import uuid
-from datetime import datetime, timedelta
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from time import perf_counter
 from typing import cast
 
 import pytz
@@ -8,16 +9,46 @@ from celery import Task, states
 from celery.exceptions import Ignore
 from seleniumbase import SB, BaseCase
 from sqlalchemy.exc import OperationalError
-from sqlmodel import Session, select
+from sqlmodel import Session, col, select
 
 from app import crud
 from app.api.deps import get_db
+from app.core.config import settings
+from app.core.db import engine, pool_usage
 from app.models.account_model import Account
-from app.models.task_model import TaskStatus, UserTask, UserTaskCreate
+from app.models.task_model import TaskStatus, UserTask
+from app.models.user_model import User
 from automation.main import MainApp
+from automation.manager.video_manager import VideoManager
+from automation.services.google_drive_service import GoogleDriveService
+from automation.utils.file_utils import FileUtils
 from automation.utils.logging_utils import logger
 from automation.utils.sb_utils import sb_utils
+from celery_worker import cleanup, partitions, planner
+from celery_worker.breaker import PlatformBreaker
 from celery_worker.celery_worker import celery_worker
+from celery_worker.events import publish_task_event
+from celery_worker.fair import fair_allocation
+from celery_worker.locks import AccountLease
+from celery_worker.rate_limit import UploadRateLimiter
+from celery_worker.task_logs import capture_task_log
+
+
+@dataclass
+class ClaimedRun:
+    """Everything a run needs once its row is PROCESSING and the session is gone."""
+
+    user_id: uuid.UUID
+    account: Account
+    platforms: list[str]
+    video: dict
+    video_path: str
+    lease: AccountLease
+    breaker: PlatformBreaker
+
+    def release(self) -> None:
+        self.breaker.release()
+        self.lease.release()
 
 
 @celery_worker.task(
@@ -27,205 +58,372 @@ from celery_worker.celery_worker import celery_worker
 def process_task(self, task_id: str):
     """
     Process a single account's task with enhanced undetection measures.
+
+    The database is only touched in short transactions (claim, progress
+    checkpoint, finalize); no connection is held while the browser runs. The
+    run's log lines are also kept in its own stream for the API to serve.
     """
-    try:
-        with next(get_db()) as session:
+    with capture_task_log(task_id), pool_usage() as usage:
+        try:
             try:
-                # Database operations
-                user_task = session.get(UserTask, task_id)
-                if not user_task:
-                    raise ValueError("Task not found")
-                account = session.get(Account, user_task.account_id)
-                if not account:
-                    raise ValueError("Associated account not found")
-
-                user_task.status = TaskStatus.PROCESSING
-                session.add(user_task)
-                session.commit()
-
-                self.update_state(
-                    state=states.STARTED,
-                    meta={
-                        "account": account.email,
-                        "status": "Processing started",
-                        "progress": 0,
-                    },
+                run = claim_task(task_id)
+            except OperationalError as oe:
+                # Transient DB error: ask Celery to retry the task with backoff
+                logger.warning(
+                    "OperationalError while trying to access DB for task %s: %s. Retrying...",
+                    task_id,
+                    oe,
                 )
+                raise self.retry(exc=oe, countdown=30)
+            if run is None:
+                return
+            try:
+                execute_run(self, task_id, run)
+            finally:
+                run.release()
+                # Fetch the account's next video while it waits for its next run
+                queue_drive_syncs([run.account.id])
+        finally:
+            logger.info(
+                "Task %s held DB connections for %.3fs over %d checkouts (%s)",
+                task_id,
+                usage.held_seconds,
+                usage.checkouts,
+                engine.pool.status(),
+            )
 
-                # Load user to get optional per-user Google credentials file
-                from app.models.user_model import User
 
-                user = session.get(User, user_task.user_id)
-                user_google_key = None
-                if user and getattr(user, "google_service_account_file", None):
-                    user_google_key = user.google_service_account_file
+def claim_task(task_id: str) -> ClaimedRun | None:
+    """
+    Check a task can run now and mark it PROCESSING, in one short transaction.
 
-                app = MainApp(
-                    user_task.user_id, user_google_credentials=user_google_key
+    Returns None when the run was dropped or put back (already started,
+    expired, video not downloaded yet, account busy, platforms tripped or
+    over the upload budget).
+    """
+    lease = None
+    breaker = None
+    with next(get_db()) as session:
+        try:
+            window = crud.live_task_window(datetime.now(pytz.utc))
+            user_id = session.exec(
+                select(UserTask.user_id).where(window).where(UserTask.id == task_id)
+            ).first()
+            if not user_id:
+                raise ValueError("Task not found")
+            # Locked in the order stop_automation takes them, user then task.
+            # A stop, which bumps the generation, either commits first and
+            # the check below drops the run, or waits for this claim to
+            # commit and then finds the run PROCESSING and revokes it. A
+            # duplicate message waits on the task row and finds it claimed.
+            user = session.exec(
+                select(User).where(User.id == user_id).with_for_update(read=True)
+            ).first()
+            user_task = session.exec(
+                select(UserTask)
+                .where(window)
+                .where(UserTask.id == task_id)
+                .with_for_update()
+            ).one()
+            # A row is only ever claimed once; a redelivered or duplicate
+            # message for a task that already started is dropped here.
+            if user_task.status not in (TaskStatus.PENDING, TaskStatus.QUEUED):
+                logger.info(
+                    "Skipping task %s already in state %s",
+                    task_id,
+                    user_task.status.value,
                 )
-                # Support both legacy 'platforms' CSV and new single 'platform' enum field
-                if hasattr(account, "platforms") and account.platforms:
-                    platforms = account.platforms.split(",")
-                else:
-                    # account.platform may be an enum or a string
-                    p = getattr(account, "platform", None)
-                    if p is None:
-                        platforms = []
-                    elif isinstance(p, str):
-                        platforms = [p]
-                    else:
-                        # Enum value
-                        try:
-                            platforms = [p.name.lower()]
-                        except Exception:
-                            platforms = [str(p).lower()]
-
-                options = sb_utils.get_undetectable_options()
-
-                with SB(uc=True, xvfb=True) as sb:
-
-                    try:
-                        self.update_state(
-                            state="PROCESSING",
-                            meta={
-                                "status": f"Running automation for {account.email}",
-                                "progress": 25,
-                            },
-                        )
-
-                        # Execute task with human-like behavior
-                        app.run_for_account(
-                            sb,
-                            account.google_drive_folder_id,
-                            account.email,
-                            account.password,
-                            platforms,
-                            account,
-                        )
-
-                        sb_utils.random_delay()
-
-                        self.update_state(
-                            state="COMPLETED",
-                            meta={"status": "Automation completed", "progress": 100},
-                        )
-                        user_task.status = TaskStatus.COMPLETED
-                        user_task.progress = 100
-
-                    except Exception as e:
-                        logger.error(
-                            f"Error processing account {account.email}: {str(e)}"
-                        )
-                        self.update_state(
-                            state=states.FAILURE,
-                            meta={
-                                "exc_type": type(e).__name__,
-                                "exc_message": str(e),
-                                "account": account.email,
-                                "progress": 100,
-                            },
-                        )
-                        user_task.status = TaskStatus.FAILED
-                        user_task.progress = 100
-                        session.add(user_task)
-                        session.commit()
-                        raise Ignore()
-
+                return None
+            # Runs planned before the user last stopped automation are dropped
+            if not user or user_task.generation != user.automation_generation:
+                logger.info("Skipping task %s from a stopped automation", task_id)
+                user_task.status = TaskStatus.STOPPED
+                session.add(user_task)
+                session.commit()
+                publish_task_event(
+                    user_task.user_id, task_id, TaskStatus.STOPPED, step="stopped"
+                )
+                return None
+            now = datetime.now(pytz.utc)
+            expires_at = as_utc(user_task.expires_at)
+            if expires_at and now > expires_at:
+                logger.info("Skipping task %s that expired at %s", task_id, expires_at)
+                user_task.status = TaskStatus.SKIPPED
                 session.add(user_task)
                 session.commit()
+                publish_task_event(
+                    user_task.user_id, task_id, TaskStatus.SKIPPED, step="expired"
+                )
+                return None
+            account = session.get(Account, user_task.account_id)
+            if not account:
+                raise ValueError("Associated account not found")
+            # Detach the account so it stays readable after the session closes
+            session.expunge(account)
+
+            # Queued before the account was paused; wait in PENDING, where the
+            # dispatcher leaves it until the account resumes or the run expires
+            if account.paused:
+                defer_task(session, user_task, now, "Account paused")
+                return None
+
+            # Videos are downloaded on the drive-io pool, never on a browser
+            # slot; until this run's video is on disk, fetch it and wait
+            video_manager = VideoManager()
+            video_manager.load_video_data(
+                account.google_drive_folder_id, str(account.owner_id)
+            )
+            video = video_manager.get_next_unuploaded_video()
+            video_path = video_manager.local_path(video) if video else None
+            if not video_path:
+                queue_drive_syncs([account.id])
+                defer_task(
+                    session,
+                    user_task,
+                    now + timedelta(seconds=settings.VIDEO_PREFETCH_DEFER_SECONDS),
+                    "Video not downloaded yet",
+                )
+                return None
+
+            # Never drive the same account from two browsers at once
+            lease = AccountLease(account.id)
+            if not lease.acquire():
+                lease = None
+                defer_task(
+                    session,
+                    user_task,
+                    now + timedelta(seconds=settings.ACCOUNT_LEASE_DEFER_SECONDS),
+                    "Account busy",
+                )
+                return None
+
+            # Leave out platforms whose circuit breaker is open
+            breaker = PlatformBreaker()
+            platforms = breaker.filter(account_platforms(account))
+            if not platforms:
+                defer_task(
+                    session,
+                    user_task,
+                    now + timedelta(seconds=settings.BREAKER_COOLDOWN_SECONDS),
+                    "All platforms are tripped",
+                )
+                return None
+
+            # Check the cluster-wide upload budget before opening a browser
+            wait = UploadRateLimiter().acquire(platforms, account.id)
+            if wait:
+                defer_task(
+                    session,
+                    user_task,
+                    now + timedelta(seconds=wait),
+                    "Upload budget exhausted",
+                )
+                return None
+
+            user_task.status = TaskStatus.PROCESSING
+            user_task.started_at = now
+            scheduled_time = as_utc(user_task.scheduled_time)
+            if scheduled_time:
+                user_task.schedule_lag = (now - scheduled_time).total_seconds()
+            session.add(user_task)
+            session.commit()
+            publish_task_event(
+                user_task.user_id,
+                task_id,
+                TaskStatus.PROCESSING,
+                progress=0,
+                step="claimed",
+            )
+            run = ClaimedRun(
+                user_task.user_id, account, platforms, video, video_path, lease, breaker
+            )
+            lease = breaker = None
+            return run
+        finally:
+            # Only reached with a lease still set when the run did not start
+            if breaker is not None:
+                breaker.release()
+            if lease is not None:
+                lease.release()
+
+
+def execute_run(task: Task, task_id: str, run: ClaimedRun) -> None:
+    """Drive the browser for a claimed run and record how it ended."""
+    account = run.account
+    task.update_state(
+        state=states.STARTED,
+        meta={
+            "account": account.email,
+            "status": "Processing started",
+            "progress": 0,
+        },
+    )
 
-            finally:
-                session.close()
-    except OperationalError as oe:
-        # Transient DB error: ask Celery to retry the task with backoff
-        logger.warning(
-            "OperationalError while trying to access DB for task %s: %s. Retrying...",
+    def report(step: str, progress: int, platform: str | None = None) -> None:
+        publish_task_event(
+            run.user_id,
             task_id,
-            oe,
+            TaskStatus.PROCESSING,
+            progress=progress,
+            step=step,
+            platform=platform,
         )
-        raise self.retry(exc=oe, countdown=30)
 
+    app = MainApp(run.user_id, on_progress=report)
+    options = sb_utils.get_undetectable_options()
+
+    with SB(uc=True, xvfb=True) as sb:
+        try:
+            task.update_state(
+                state="PROCESSING",
+                meta={
+                    "status": f"Running automation for {account.email}",
+                    "progress": 25,
+                },
+            )
+            checkpoint_task(task_id, progress=25)
+            report("browser_started", 25)
+
+            # Execute task with human-like behavior
+            outcomes = app.run_for_account(
+                sb,
+                account.google_drive_folder_id,
+                run.video,
+                run.video_path,
+                account.email,
+                account.password,
+                run.platforms,
+                account,
+            )
+            for platform, uploaded in outcomes.items():
+                state = run.breaker.record(platform, uploaded)
+                if state != "closed":
+                    logger.warning("Circuit breaker for %s is %s", platform, state)
 
-@celery_worker.task(bind=True)
-def run_user_automation(self, user_id: str | uuid.UUID):
-    try:
-        # Normalize user_id to uuid.UUID when possible (accept str or UUID)
-        if isinstance(user_id, (str, uuid.UUID)):
-            try:
-                user_id_uuid = uuid.UUID(str(user_id))
-            except Exception:
-                logger.warning(
-                    "Invalid user_id passed to run_user_automation: %s", user_id
-                )
-                return
-        else:
-            # If a non-str/UUID is passed, we can't proceed safely
-            logger.warning(
-                "Unsupported user_id type passed to run_user_automation: %r", user_id
+            sb_utils.random_delay()
+
+            task.update_state(
+                state="COMPLETED",
+                meta={"status": "Automation completed", "progress": 100},
+            )
+            checkpoint_task(
+                task_id,
+                status=TaskStatus.COMPLETED,
+                progress=100,
+                finished_at=datetime.now(pytz.utc),
+            )
+            publish_task_event(run.user_id, task_id, TaskStatus.COMPLETED, progress=100)
+
+        except Exception as e:
+            logger.error(f"Error processing account {account.email}: {str(e)}")
+            task.update_state(
+                state=states.FAILURE,
+                meta={
+                    "exc_type": type(e).__name__,
+                    "exc_message": str(e),
+                    "account": account.email,
+                    "progress": 100,
+                },
+            )
+            checkpoint_task(
+                task_id,
+                status=TaskStatus.FAILED,
+                progress=100,
+                finished_at=datetime.now(pytz.utc),
             )
-            return
+            publish_task_event(
+                run.user_id, task_id, TaskStatus.FAILED, progress=100, error=str(e)
+            )
+            raise Ignore()
 
-        with next(get_db()) as session:
-            # Get all accounts for the user
-            statement = select(Account).where(Account.owner_id == user_id_uuid)
-            accounts = session.exec(statement).all()
 
-        if not accounts:
-            logger.warning(f"No accounts found for user_id: {user_id}")
-            return
+def checkpoint_task(task_id: str, **values) -> None:
+    """Write progress or the final state of a run in its own short transaction."""
+    with next(get_db()) as session:
+        crud.set_task_fields(session=session, task_id=task_id, **values)
+        session.commit()
 
-        # Get the current time in UTC
-        now = datetime.now(pytz.utc)
 
-        # Set the start time to now
-        start_time = now
+def account_platforms(account: Account) -> list[str]:
+    """Platforms a run of ``account`` uploads to."""
+    # Support both legacy 'platforms' CSV and new single 'platform' enum field
+    if getattr(account, "platforms", None):
+        return account.platforms.split(",")
+    # account.platform may be an enum or a string
+    p = getattr(account, "platform", None)
+    if p is None:
+        return []
+    if isinstance(p, str):
+        return [p]
+    # Enum value
+    try:
+        return [p.name.lower()]
+    except Exception:
+        return [str(p).lower()]
 
-        # Number of runs per day
-        num_runs_per_day = random.randint(10, 15)
 
-        # Time interval between tasks (5-6 minutes)
-        task_interval = timedelta(minutes=random.randint(5, 6))
+def defer_task(
+    session: Session, user_task: UserTask, retry_at: datetime, reason: str
+) -> None:
+    """
+    Put back a run that cannot start now.
 
-        for run in range(num_runs_per_day):
-            for account in accounts:
-                # Calculate the scheduled time for this task
-                scheduled_time = (
-                    start_time
-                    + (run * len(accounts) + accounts.index(account)) * task_interval
-                )
+    The run goes back to PENDING at ``retry_at`` for the dispatcher to pick up
+    again, unless that would take it past its expiry, in which case it is
+    skipped and the account waits for its next planned run.
+    """
+    expires_at = as_utc(user_task.expires_at)
+    if expires_at and retry_at > expires_at:
+        logger.info("%s; skipping task %s", reason, user_task.id)
+        user_task.status = TaskStatus.SKIPPED
+    else:
+        logger.info("%s; deferring task %s to %s", reason, user_task.id, retry_at)
+        user_task.status = TaskStatus.PENDING
+        user_task.scheduled_time = retry_at
+    user_task.updated_at = datetime.now(pytz.utc)
+    session.add(user_task)
+    session.commit()
+    publish_task_event(
+        user_task.user_id, user_task.id, user_task.status, step="deferred"
+    )
 
-                # Create a new UserTask
-                user_task_in = UserTaskCreate(
-                    title=f"Automation for account {account.email}",
-                    user_id=user_id_uuid,
-                    account_id=account.id,
-                    status=TaskStatus.PENDING,
-                    scheduled_time=scheduled_time,
-                )
-                user_task = crud.create_task(session=session, task_in=user_task_in)
 
-                # Schedule the task and record the Celery task id on the DB row
-                celery_result = schedule_task_automation(
-                    str(user_task.id), eta=scheduled_time
-                )
-                try:
-                    # celery_result may be a AsyncResult-like or task id string depending on backend
-                    celery_id = getattr(celery_result, "id", None) or str(celery_result)
-                    user_task.task_id = celery_id
-                    session.add(user_task)
-                    session.commit()
-                except Exception:
-                    logger.exception(
-                        "Failed to store celery task id for usertask %s",
-                        str(user_task.id),
-                    )
+@celery_worker.task(bind=True)
+def run_user_automation(
+    self,
+    user_id: str | uuid.UUID,
+    plan_date: str | None = None,
+    runs: int | None = None,
+) -> int:
+    """
+    Plan one day of automation for a user (today by default).
 
-                logger.info(
-                    f"Scheduled task for account {account.email} at {scheduled_time} UTC"
-                )
+    ``runs`` overrides the number of runs per account, e.g. when admission
+    control only had room for fewer than usual.
 
-        session.commit()
+    Used when a user starts automation; later days are planned for everyone by
+    plan_all_users. Planning is idempotent per (user, date): repeated or
+    overlapping calls for a day that is already planned create no tasks.
+    """
+    # Normalize user_id to uuid.UUID when possible (accept str or UUID)
+    if isinstance(user_id, (str, uuid.UUID)):
+        try:
+            user_id_uuid = uuid.UUID(str(user_id))
+        except Exception:
+            logger.warning("Invalid user_id passed to run_user_automation: %s", user_id)
+            return 0
+    else:
+        # If a non-str/UUID is passed, we can't proceed safely
+        logger.warning(
+            "Unsupported user_id type passed to run_user_automation: %r", user_id
+        )
+        return 0
+
+    day = date.fromisoformat(plan_date) if plan_date else datetime.now(pytz.utc).date()
 
+    try:
+        with next(get_db()) as session:
+            created = planner.plan_user_day(session, user_id_uuid, day, runs)
     except OperationalError as oe:
         logger.warning(
             "OperationalError while preparing run_user_automation for user %s: %s. Retrying...",
@@ -234,22 +432,186 @@ def run_user_automation(self, user_id: str | uuid.UUID):
         )
         raise self.retry(exc=oe, countdown=60)
 
-    # Schedule the next day's automation
-    next_day_start = start_time + timedelta(days=1)
-    celery_worker.send_task(
-        "celery_worker.task.run_user_automation",
-        args=[str(user_id)],
-        eta=next_day_start,
-    )
+    if not created:
+        logger.info(
+            "Nothing to plan for user_id %s on %s (already planned or no accounts)",
+            user_id,
+            day,
+        )
+        return 0
+
+    logger.info("Planned %d tasks for user_id %s on %s", created, user_id, day)
+
+    with next(get_db()) as session:
+        account_ids = session.exec(
+            select(Account.id).where(Account.owner_id == user_id_uuid)
+        ).all()
+    queue_drive_syncs(account_ids)
+    return created
+
+
+@celery_worker.task
+def plan_all_users(plan_date: str | None = None) -> dict:
+    """
+    Plan the day for every active user with automation enabled in one pass.
+
+    Runs once a day from beat and replaces the per-user chain of next-day
+    messages that used to sit in the broker.
+    """
+    day = date.fromisoformat(plan_date) if plan_date else datetime.now(pytz.utc).date()
+    started = perf_counter()
+    with next(get_db()) as session:
+        created = planner.plan_all_users_day(session, day)
+        account_ids = session.exec(
+            select(Account.id)
+            .join(User, col(User.id) == Account.owner_id)
+            .where(User.is_active, User.automation_enabled)
+        ).all()
+    duration_ms = round((perf_counter() - started) * 1000, 1)
 
     logger.info(
-        f"Scheduled next day's automation for user_id: {user_id} at {next_day_start} UTC"
+        "Global planner created %d tasks for %s in %.1f ms", created, day, duration_ms
     )
+    queue_drive_syncs(account_ids)
+    return {
+        "plan_date": day.isoformat(),
+        "created": created,
+        "duration_ms": duration_ms,
+    }
+
+
+@celery_worker.task
+def maintain_usertask_partitions() -> dict:
+    """
+    Create upcoming usertask partitions and retire those past retention.
+
+    Also closes live runs older than the window the dispatcher looks at, so
+    none is left PENDING or PROCESSING out of its sight.
+    """
+    now = datetime.now(pytz.utc)
+    today = now.date()
+    cutoff = today - timedelta(days=settings.USERTASK_RETENTION_DAYS)
+    with next(get_db()) as session:
+        abandoned = crud.close_abandoned_tasks(session=session, now=now)
+        session.commit()
+    if abandoned:
+        logger.warning("Closed %d live runs older than the live window", abandoned)
+    with next(get_db()) as session:
+        created = partitions.ensure_partitions(
+            session, today, settings.USERTASK_PARTITION_MONTHS_AHEAD
+        )
+        retired = partitions.retire_partitions(
+            session, cutoff, settings.USERTASK_ARCHIVE_SCHEMA
+        )
+    if created or retired:
+        logger.info(
+            "usertask partitions: created %s, retired %s",
+            ", ".join(created) or "none",
+            ", ".join(retired) or "none",
+        )
+    return {"created": created, "retired": retired, "abandoned": abandoned}
+
+
+@celery_worker.task
+def delete_user_tasks(user_id: str) -> int:
+    """
+    Delete a user's whole task history in batches, recording progress.
+
+    Each batch commits on its own so no transaction holds locks on the
+    history for long; a job that fails part-way leaves the rest in place and
+    can simply be started again.
+    """
+    user_uuid = uuid.UUID(user_id)
+    deleted = 0
+    try:
+        while True:
+            with next(get_db()) as session:
+                batch = session.execute(
+                    crud.user_tasks_batch(user_uuid, settings.TASK_DELETE_BATCH_SIZE)
+                ).rowcount
+                session.commit()
+            if not batch:
+                break
+            deleted += batch
+            cleanup.record_progress(user_id, batch)
+    except Exception:
+        cleanup.finish_progress(user_id, "failed")
+        raise
+    cleanup.finish_progress(user_id, "done")
+    logger.info("Deleted %d tasks of user %s", deleted, user_id)
+    return deleted
+
+
+@celery_worker.task
+def sync_drive_folder(account_id: str) -> int:
+    """
+    Get an account's next video onto local disk ahead of its browser run.
+
+    Runs on the drive-io pool so neither the Drive API listing nor the
+    download happens on a browser slot. The video list is refreshed once the
+    account has nothing left to upload, then the next video is downloaded
+    unless it already is. Nothing is done while a browser run holds the
+    account, so video_data.json is never rewritten under it. Returns the
+    number of videos downloaded.
+    """
+    with next(get_db()) as session:
+        account = session.get(Account, account_id)
+        if not account:
+            return 0
+        user = session.get(User, account.owner_id)
+        folder_id = account.google_drive_folder_id
+        user_id = str(account.owner_id)
+        user_google_key = user.google_service_account_file if user else None
+
+    video_manager = VideoManager()
+    video_manager.load_video_data(folder_id, user_id)
+    video = video_manager.get_next_unuploaded_video()
+    if video is not None and video_manager.local_path(video):
+        return 0
+
+    lease = AccountLease(account_id)
+    if not lease.acquire():
+        return 0
+    try:
+        google_drive = GoogleDriveService(credentials_path=user_google_key)
+        # Read again under the lease; a run may have finished meanwhile
+        video_manager.load_video_data(folder_id, user_id)
+        video = video_manager.get_next_unuploaded_video()
+        if video is None:
+            videos = google_drive.list_videos(folder_id)
+            video_manager.update_video_data(videos, folder_id, user_id)
+            logger.info(
+                "Synced %d Drive videos for account %s", len(videos), account_id
+            )
+            video = video_manager.get_next_unuploaded_video()
+        if video is None or video_manager.local_path(video):
+            return 0
+        video_path = google_drive.download_video(
+            video["id"], FileUtils.get_video_path(video["name"])
+        )
+        video_manager.mark_as_downloaded(video["id"], video_path, folder_id, user_id)
+    finally:
+        lease.release()
+
+    logger.info("Downloaded video %s for account %s", video["name"], account_id)
+    return 1
+
+
+def queue_drive_syncs(account_ids) -> None:
+    """Send one sync_drive_folder message per account over one connection."""
+    with celery_worker.producer_or_acquire() as producer:
+        for account_id in account_ids:
+            celery_worker.send_task(
+                "celery_worker.task.sync_drive_folder",
+                args=[str(account_id)],
+                producer=producer,
+            )
 
 
 @celery_worker.task
 def schedule_next_day(user_id: int | str):
-    # Schedule the next day's run via the broker to avoid calling the bound task directly
+    # Kept for messages already queued by older releases. Planning is
+    # idempotent, so this never duplicates what plan_all_users created.
     celery_worker.send_task(
         "celery_worker.task.run_user_automation", args=[str(user_id)]
     )
@@ -259,3 +621,67 @@ def schedule_task_automation(task_id: str, eta: datetime) -> Task:
     return celery_worker.send_task(
         "celery_worker.task.process_task", args=[task_id], eta=eta
     )
+
+
+@celery_worker.task
+def dispatch_due_tasks() -> int:
+    """
+    Hand UserTask rows that come due within the lookahead window to the broker.
+
+    Runs every few seconds from beat, so the broker only ever holds work that
+    is about to start instead of a day's worth of far-future ETA messages.
+    Only as many runs as there are free browser slots are handed out, shared
+    between users by ``fair.fair_allocation``; the rest wait in PENDING.
+    """
+    now = datetime.now(pytz.utc)
+    due_before = now + timedelta(seconds=settings.DISPATCH_LOOKAHEAD_SECONDS)
+    with next(get_db()) as session:
+        expired = crud.expire_stale_tasks(session=session, now=now)
+        session.commit()
+    if expired:
+        logger.info("Skipped %d runs that expired before they could start", expired)
+
+    dispatched = 0
+    with next(get_db()) as session:
+        allocation = fair_allocation(session, due_before, now)
+        for user_id, limit in allocation.items():
+            due = crud.claim_due_tasks(
+                session=session, due_before=due_before, limit=limit, user_id=user_id
+            )
+            if due:
+                schedule_tasks_automation(due)
+                session.commit()
+            dispatched += len(due)
+
+    if dispatched:
+        logger.info("Dispatched %d due tasks for %d users", dispatched, len(allocation))
+    return dispatched
+
+
+def schedule_tasks_automation(user_tasks) -> None:
+    """Publish many ``process_task`` messages over a single broker connection.
+
+    ``user_tasks`` are ``(id, task_id, scheduled_time, expires_at)`` rows as
+    returned by ``crud.claim_due_tasks``; the stored Celery id is reused so the
+    DB row and the broker message agree without a second UPDATE. Messages carry
+    the row's expiry so a worker that falls behind drops them unstarted.
+    """
+    now = datetime.now(pytz.utc)
+    with celery_worker.producer_or_acquire() as producer:
+        for user_task_id, celery_id, scheduled_time, expires_at in user_tasks:
+            scheduled_time = as_utc(scheduled_time)
+            celery_worker.send_task(
+                "celery_worker.task.process_task",
+                args=[str(user_task_id)],
+                eta=scheduled_time if scheduled_time and scheduled_time > now else None,
+                expires=as_utc(expires_at),
+                task_id=celery_id,
+                producer=producer,
+            )
+
+
+def as_utc(value: datetime | None) -> datetime | None:
+    """Attach UTC to naive timestamps read back from the database."""
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=pytz.utc)
+    return value
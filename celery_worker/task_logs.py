@@ -0,0 +1,79 @@
+"""
+Per-task log capture in Redis Streams.
+
+While ``process_task`` runs, records sent to the automation logger are also
+appended to ``tasklog:<task_id>``, a stream capped at ``TASK_LOG_MAX_ENTRIES``
+entries that expires ``TASK_LOG_TTL_SECONDS`` after the last write. Stream ids
+double as read cursors, so the API can page through one run's log or follow
+it live without touching the shared worker log file.
+"""
+
+import logging
+import threading
+import uuid
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+import redis
+
+from app.core.config import settings
+from app.core.redis import get_redis
+from automation.utils.logging_utils import logger
+
+
+def task_log_key(task_id: uuid.UUID | str) -> str:
+    return f"tasklog:{task_id}"
+
+
+class TaskLogHandler(logging.Handler):
+    """
+    Appends the records of one run to its stream.
+
+    Only records logged from the thread that created the handler are kept:
+    the logger is process-wide, and anything else running in the worker
+    process belongs to other work.
+    """
+
+    def __init__(
+        self,
+        task_id: uuid.UUID | str,
+        client: redis.Redis | None = None,
+        level: int = logging.NOTSET,
+    ) -> None:
+        super().__init__(level)
+        self.key = task_log_key(task_id)
+        self.client = client or get_redis()
+        self.thread_id = threading.get_ident()
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if record.thread != self.thread_id:
+            return
+        try:
+            message = record.getMessage()
+            if record.exc_info:
+                message = (
+                    f"{message}\n{logging.Formatter().formatException(record.exc_info)}"
+                )
+            pipe = self.client.pipeline(transaction=False)
+            pipe.xadd(
+                self.key,
+                {"ts": record.created, "level": record.levelname, "message": message},
+                maxlen=settings.TASK_LOG_MAX_ENTRIES,
+                approximate=True,
+            )
+            pipe.expire(self.key, settings.TASK_LOG_TTL_SECONDS)
+            pipe.execute()
+        except Exception:
+            # Never let log capture break the run; report like any handler
+            self.handleError(record)
+
+
+@contextmanager
+def capture_task_log(task_id: uuid.UUID | str) -> Iterator[TaskLogHandler]:
+    """Copy the automation logger's records into the task's stream meanwhile."""
+    handler = TaskLogHandler(task_id)
+    logger.addHandler(handler)
+    try:
+        yield handler
+    finally:
+        logger.removeHandler(handler)
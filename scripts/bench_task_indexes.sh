@@ -0,0 +1,168 @@
+#!/usr/bin/env bash
+
+# Show the plans of the hot task/account queries before and after the indexes
+# added in 2026_add_task_query_indexes, on a seeded copy of usertask.
+#
+# Everything happens in a scratch "bench" schema that is dropped at the end;
+# the real tables are only used as a column template. Connection settings come
+# from .env (POSTGRES_*), or from the file named by ENV_FILE. Override the data
+# size with ROWS, USERS and ACCOUNTS_PER_USER, e.g.
+# ROWS=1000000 scripts/bench_task_indexes.sh
+
+set -eu
+
+ROOT_DIR=$(cd "$(dirname "$0")/.." && pwd)
+set -a
+# shellcheck disable=SC1091
+. "${ENV_FILE:-$ROOT_DIR/.env}"
+set +a
+
+ROWS=${ROWS:-10000000}
+USERS=${USERS:-2000}
+ACCOUNTS_PER_USER=${ACCOUNTS_PER_USER:-10}
+
+export PGPASSWORD="$POSTGRES_PASSWORD"
+psql_bench() {
+    psql -h "$POSTGRES_SERVER" -p "$POSTGRES_PORT" -U "$POSTGRES_USER" \
+        -d "$POSTGRES_DB" -v ON_ERROR_STOP=1 -X -q \
+        -v rows="$ROWS" -v users="$USERS" -v accounts="$ACCOUNTS_PER_USER" "$@"
+}
+
+explain_hot_queries() {
+    psql_bench <<'SQL'
+SELECT owner_id AS uid FROM bench.account LIMIT 1 \gset
+
+\echo '--- stop/start_automation: a user''s PROCESSING tasks'
+EXPLAIN (ANALYZE, BUFFERS)
+SELECT id, task_id FROM bench.usertask
+WHERE user_id = :'uid' AND status = 'PROCESSING';
+
+\echo '--- get_automation_status: all of a user''s tasks'
+EXPLAIN (ANALYZE, BUFFERS)
+SELECT id, account_id, task_id, status FROM bench.usertask WHERE user_id = :'uid';
+
+\echo '--- read_accounts / planning: a user''s accounts'
+EXPLAIN (ANALYZE, BUFFERS)
+SELECT * FROM bench.account WHERE owner_id = :'uid';
+
+\echo '--- expire_stale_tasks: expired PENDING/QUEUED rows'
+EXPLAIN (ANALYZE, BUFFERS)
+SELECT count(*) FROM bench.usertask
+WHERE status IN ('PENDING', 'QUEUED') AND expires_at < now();
+
+\echo '--- fair dispatch: runs in flight per user'
+EXPLAIN (ANALYZE, BUFFERS)
+SELECT user_id, count(*) FROM bench.usertask
+WHERE status = 'QUEUED'
+   OR (status = 'PROCESSING' AND started_at >= now() - interval '1 hour')
+GROUP BY user_id;
+
+\echo '--- planner/admission: runs booked in the next day (booked_buckets)'
+EXPLAIN (ANALYZE, BUFFERS)
+SELECT floor(extract(epoch FROM scheduled_time) / 900), count(*) FROM bench.usertask
+WHERE status IN ('PENDING', 'QUEUED', 'PROCESSING')
+  AND scheduled_time >= now() AND scheduled_time < now() + interval '1 day'
+GROUP BY 1;
+
+\echo '--- fair dispatch: due backlog per user'
+EXPLAIN (ANALYZE, BUFFERS)
+SELECT user_id, count(*) FROM bench.usertask
+WHERE status = 'PENDING' AND scheduled_time <= now() + interval '1 hour'
+GROUP BY user_id;
+
+\echo '--- claim_due_tasks for one user'
+BEGIN;
+EXPLAIN (ANALYZE, BUFFERS)
+SELECT id, task_id, scheduled_time, expires_at, account_id FROM bench.usertask
+WHERE status = 'PENDING' AND scheduled_time <= now() + interval '1 day'
+  AND user_id = :'uid'
+ORDER BY scheduled_time
+LIMIT 4
+FOR UPDATE SKIP LOCKED;
+ROLLBACK;
+SQL
+}
+
+echo "Seeding $ROWS tasks for $USERS users x $ACCOUNTS_PER_USER accounts..."
+psql_bench <<'SQL'
+DROP SCHEMA IF EXISTS bench CASCADE;
+CREATE SCHEMA bench;
+
+-- Only the account columns the listing touches; older databases differ in
+-- the rest
+CREATE TABLE bench.account (
+    id uuid NOT NULL,
+    owner_id uuid NOT NULL,
+    name varchar(255) NOT NULL,
+    email varchar(255) NOT NULL,
+    google_drive_folder_id varchar(255) NOT NULL,
+    platforms varchar(255)
+);
+INSERT INTO bench.account (id, owner_id, name, email, google_drive_folder_id, platforms)
+SELECT md5('account' || a)::uuid, md5('user' || (a % :users))::uuid,
+       'bench ' || a, 'bench' || a || '@example.com', 'folder', 'youtube,tiktok'
+FROM generate_series(0, :users * :accounts - 1) AS a;
+ALTER TABLE bench.account ADD PRIMARY KEY (id);
+
+-- Mostly finished history, with a thin slice of live rows, like production
+CREATE TABLE bench.usertask (LIKE public.usertask INCLUDING DEFAULTS);
+INSERT INTO bench.usertask (
+    id, status, progress, task_id, scheduled_time, user_id, account_id,
+    expires_at, started_at, created_at, updated_at
+)
+SELECT gen_random_uuid(), s.status::taskstatus, 0, gen_random_uuid()::text,
+       s.at, md5('user' || (s.a % :users))::uuid, md5('account' || s.a)::uuid,
+       s.at + interval '30 minutes',
+       CASE WHEN s.status = 'PROCESSING' THEN now() - interval '5 minutes' END,
+       s.at - interval '1 day', s.at
+FROM (
+    SELECT g % (:users * :accounts) AS a,
+           CASE
+               WHEN g % 1000 = 0 THEN 'PENDING'
+               WHEN g % 5000 = 1 THEN 'QUEUED'
+               WHEN g % 5000 = 2 THEN 'PROCESSING'
+               WHEN g % 10 = 3 THEN 'FAILED'
+               WHEN g % 10 = 4 THEN 'SKIPPED'
+               ELSE 'COMPLETED'
+           END AS status,
+           CASE
+               WHEN g % 1000 = 0 THEN now() + (g % 86400) * interval '1 second'
+               ELSE now() - (:rows - g) * interval '3 seconds'
+           END AS at
+    FROM generate_series(1, :rows) AS g
+) AS s;
+ALTER TABLE bench.usertask ADD PRIMARY KEY (id);
+
+-- Indexes as they were before the migration
+CREATE INDEX ix_usertask_user_id ON bench.usertask (user_id);
+CREATE INDEX ix_usertask_task_id ON bench.usertask (task_id);
+CREATE INDEX ix_usertask_scheduled_time ON bench.usertask (scheduled_time);
+ANALYZE bench.account;
+ANALYZE bench.usertask;
+SQL
+
+echo
+echo "===================== BEFORE ====================="
+explain_hot_queries
+
+psql_bench <<'SQL'
+CREATE INDEX ix_account_owner_id ON bench.account (owner_id);
+CREATE INDEX ix_usertask_user_id_status ON bench.usertask (user_id, status);
+CREATE INDEX ix_usertask_active_status_expires_at ON bench.usertask (status, expires_at)
+    WHERE status IN ('PENDING', 'QUEUED', 'PROCESSING');
+CREATE INDEX ix_usertask_pending_scheduled_time ON bench.usertask (scheduled_time)
+    WHERE status = 'PENDING';
+CREATE INDEX ix_usertask_pending_user_id_scheduled_time
+    ON bench.usertask (user_id, scheduled_time)
+    WHERE status = 'PENDING';
+DROP INDEX bench.ix_usertask_user_id;
+DROP INDEX bench.ix_usertask_scheduled_time;
+ANALYZE bench.account;
+ANALYZE bench.usertask;
+SQL
+
+echo
+echo "===================== AFTER ======================"
+explain_hot_queries
+
+psql_bench -c "DROP SCHEMA bench CASCADE;"
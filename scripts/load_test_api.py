@@ -0,0 +1,148 @@
+"""
+Concurrent read load against the accounts and automation routes.
+
+Runs each concurrency level for a fixed time and prints requests/s and latency
+percentiles, so the same command can be run against two builds (e.g. before
+and after the routes moved to the async session) and the tables compared:
+
+    python scripts/load_test_api.py --email admin@example.com --password ...
+    python scripts/load_test_api.py --token "$TOKEN" --concurrency 10,50,200
+
+Only the standard library is used, so it runs from any checkout. The client
+opens one connection per request; at high concurrency make sure the client
+machine is not the bottleneck (compare with a trivial route like
+/utils/health-check/).
+"""
+
+import argparse
+import json
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_PATHS = (
+    "/accounts/",
+    "/automation/automation_status/?limit=50",
+)
+
+
+def login(base_url: str, email: str, password: str) -> str:
+    body = urllib.parse.urlencode({"username": email, "password": password})
+    request = urllib.request.Request(
+        f"{base_url}/login/access-token", data=body.encode(), method="POST"
+    )
+    with urllib.request.urlopen(request, timeout=30) as response:
+        return json.load(response)["access_token"]
+
+
+def hammer(
+    base_url: str, paths: list[str], token: str, deadline: float
+) -> tuple[list[float], int]:
+    """Request ``paths`` in turn until ``deadline``; return latencies and errors."""
+    latencies: list[float] = []
+    errors = 0
+    headers = {"Authorization": f"Bearer {token}"}
+    index = 0
+    while time.perf_counter() < deadline:
+        request = urllib.request.Request(
+            base_url + paths[index % len(paths)], headers=headers
+        )
+        index += 1
+        started = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request, timeout=60) as response:
+                response.read()
+        except (urllib.error.URLError, TimeoutError):
+            errors += 1
+            continue
+        latencies.append(time.perf_counter() - started)
+    return latencies, errors
+
+
+def run_level(
+    base_url: str, paths: list[str], token: str, concurrency: int, duration: float
+) -> dict[str, float]:
+    start = threading.Barrier(concurrency + 1)
+    deadline_box: list[float] = []
+
+    def worker() -> tuple[list[float], int]:
+        start.wait()
+        return hammer(base_url, paths, token, deadline_box[0])
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = [pool.submit(worker) for _ in range(concurrency)]
+        deadline_box.append(time.perf_counter() + duration)
+        begin = time.perf_counter()
+        start.wait()
+        results = [future.result() for future in futures]
+        elapsed = time.perf_counter() - begin
+
+    latencies = sorted(latency for batch, _ in results for latency in batch)
+    errors = sum(count for _, count in results)
+    if len(latencies) >= 2:
+        cuts = statistics.quantiles(latencies, n=100)
+        p50, p95, p99 = cuts[49], cuts[94], cuts[98]
+    else:
+        p50 = p95 = p99 = latencies[0] if latencies else 0.0
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed,
+        "p50_ms": p50 * 1000,
+        "p95_ms": p95 * 1000,
+        "p99_ms": p99 * 1000,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--base-url", default="http://localhost:8000/api/v1")
+    parser.add_argument("--token", help="bearer token; or use --email/--password")
+    parser.add_argument("--email")
+    parser.add_argument("--password")
+    parser.add_argument(
+        "--concurrency",
+        default="1,10,50,100",
+        help="comma-separated numbers of concurrent clients",
+    )
+    parser.add_argument(
+        "--duration", type=float, default=20.0, help="seconds per level"
+    )
+    parser.add_argument(
+        "--path",
+        action="append",
+        dest="paths",
+        help="route to request, relative to --base-url (repeatable)",
+    )
+    args = parser.parse_args()
+
+    base_url = args.base_url.rstrip("/")
+    if args.token:
+        token = args.token
+    elif args.email and args.password:
+        token = login(base_url, args.email, args.password)
+    else:
+        parser.error("pass --token or --email and --password")
+    paths = args.paths or list(DEFAULT_PATHS)
+
+    print(f"{base_url}: {', '.join(paths)}")
+    print(
+        f"{'clients':>8} {'requests':>9} {'errors':>7} {'req/s':>9} "
+        f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"
+    )
+    for level in (int(value) for value in args.concurrency.split(",")):
+        row = run_level(base_url, paths, token, level, args.duration)
+        print(
+            f"{row['concurrency']:>8} {row['requests']:>9} {row['errors']:>7} "
+            f"{row['rps']:>9.1f} {row['p50_ms']:>8.1f} {row['p95_ms']:>8.1f} "
+            f"{row['p99_ms']:>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
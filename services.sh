@@ -2,7 +2,8 @@
 
 # Minimal service manager: start_all and stop_all (plus status and logs)
 # Designed to be simple and easy to reason about. It starts Redis (Docker),
-# FastAPI and a Celery worker using nohup and records PID files so stop is easy.
+# FastAPI, one Celery worker per queue (browser, planning, drive-io) and
+# Celery beat using nohup and records PID files so stop is easy.
 
 set -eu
 
@@ -16,16 +17,29 @@ REDIS_IMAGE="redis:latest"
 FASTAPI_APP="app.main:app"
 CELERY_APP="celery_worker.celery_worker"
 UVICORN_PORT=8000
+
+# Worker pool sizing. The browser pool should match the number of concurrent
+# Chrome sessions the host can run (BROWSER_SLOTS in .env); planning and Drive
+# I/O are lightweight and run on threads.
+BROWSER_SLOTS=${BROWSER_SLOTS:-4}
+PLANNING_CONCURRENCY=${PLANNING_CONCURRENCY:-4}
+DRIVE_IO_CONCURRENCY=${DRIVE_IO_CONCURRENCY:-8}
 FLOWER_PORT=5555
 
 FASTAPI_LOG="$LOG_DIR/fastapi.log"
 CELERY_LOG="$LOG_DIR/celery_worker.log"
+PLANNING_LOG="$LOG_DIR/celery_planning.log"
+DRIVE_LOG="$LOG_DIR/celery_drive_io.log"
 FLOWER_LOG="$LOG_DIR/flower.log"
+BEAT_LOG="$LOG_DIR/celery_beat.log"
 REDIS_LOG="$LOG_DIR/redis.log"
 
 FASTAPI_PID_FILE="$ROOT_DIR/fastapi.pid"
 CELERY_PID_FILE="$ROOT_DIR/celery.pid"
+PLANNING_PID_FILE="$ROOT_DIR/celery_planning.pid"
+DRIVE_PID_FILE="$ROOT_DIR/celery_drive_io.pid"
 FLOWER_PID_FILE="$ROOT_DIR/flower.pid"
+BEAT_PID_FILE="$ROOT_DIR/celerybeat.pid"
 
 # External Redis: if EXTERNAL_REDIS is set, the script will not manage Docker Redis.
 # Set REDIS_URL externally, e.g. EXTERNAL_REDIS=1 REDIS_URL=redis://host:6379 ./services.sh start
@@ -106,28 +120,74 @@ stop_fastapi() {
 }
 
 start_celery() {
-    echo "Starting Celery worker..."
-    nohup env CELERY_BROKER_URL="$REDIS_URL" CELERY_RESULT_BACKEND="$REDIS_URL" uv run celery -A $CELERY_APP worker --loglevel=info > "$CELERY_LOG" 2>&1 &
+    echo "Starting Celery browser worker ($BROWSER_SLOTS slots)..."
+    nohup env CELERY_BROKER_URL="$REDIS_URL" CELERY_RESULT_BACKEND="$REDIS_URL" DB_POOL_ROLE=prefork uv run celery -A $CELERY_APP worker -Q browser -n browser@%h --concurrency=$BROWSER_SLOTS -O fair --loglevel=info > "$CELERY_LOG" 2>&1 &
     echo $! > "$CELERY_PID_FILE"
+
+    echo "Starting Celery planning worker..."
+    nohup env CELERY_BROKER_URL="$REDIS_URL" CELERY_RESULT_BACKEND="$REDIS_URL" DB_POOL_ROLE=threads DB_THREADS_POOL_SIZE=$PLANNING_CONCURRENCY uv run celery -A $CELERY_APP worker -Q planning -n planning@%h --pool=threads --concurrency=$PLANNING_CONCURRENCY --loglevel=info > "$PLANNING_LOG" 2>&1 &
+    echo $! > "$PLANNING_PID_FILE"
+
+    echo "Starting Celery drive-io worker..."
+    nohup env CELERY_BROKER_URL="$REDIS_URL" CELERY_RESULT_BACKEND="$REDIS_URL" DB_POOL_ROLE=threads uv run celery -A $CELERY_APP worker -Q drive-io -n drive-io@%h --pool=threads --concurrency=$DRIVE_IO_CONCURRENCY --loglevel=info > "$DRIVE_LOG" 2>&1 &
+    echo $! > "$DRIVE_PID_FILE"
+}
+
+start_beat() {
+    # Beat drives the just-in-time dispatcher that moves due UserTask rows to the broker
+    echo "Starting Celery beat..."
+    nohup env CELERY_BROKER_URL="$REDIS_URL" CELERY_RESULT_BACKEND="$REDIS_URL" DB_POOL_ROLE=prefork uv run celery -A $CELERY_APP beat --loglevel=info --pidfile= > "$BEAT_LOG" 2>&1 &
+    echo $! > "$BEAT_PID_FILE"
+}
+
+stop_beat() {
+    if [ -f "$BEAT_PID_FILE" ]; then
+        PID=$(cat "$BEAT_PID_FILE")
+        echo "Stopping Celery beat pid $PID"
+        kill "$PID" >/dev/null 2>&1 || true
+        sleep 1
+        kill -0 "$PID" >/dev/null 2>&1 || true && kill -9 "$PID" >/dev/null 2>&1 || true
+        rm -f "$BEAT_PID_FILE"
+    else
+        echo "Celery beat PID file not found; attempting to stop by name..."
+        PIDS=$(pgrep -f "celery.*beat") || true
+        if [ -n "${PIDS:-}" ]; then
+            echo "Killing celery beat pids: $PIDS"
+            kill $PIDS || kill -9 $PIDS || true
+        else
+            echo "No celery beat processes found."
+        fi
+    fi
 }
 
 start_flower() {
     echo "Starting Flower monitoring..."
-    nohup env CELERY_BROKER_URL="$REDIS_URL" CELERY_RESULT_BACKEND="$REDIS_URL" uv run celery -A $CELERY_APP flower --port=$FLOWER_PORT > "$FLOWER_LOG" 2>&1 &
+    nohup env CELERY_BROKER_URL="$REDIS_URL" CELERY_RESULT_BACKEND="$REDIS_URL" DB_POOL_ROLE=prefork uv run celery -A $CELERY_APP flower --port=$FLOWER_PORT > "$FLOWER_LOG" 2>&1 &
     echo $! > "$FLOWER_PID_FILE"
 }
 
-stop_celery() {
-    if [ -f "$CELERY_PID_FILE" ]; then
-        PID=$(cat "$CELERY_PID_FILE")
-        echo "Stopping Celery pid $PID"
+stop_worker_pid() {
+    # $1: pool name, $2: PID file
+    if [ -f "$2" ]; then
+        PID=$(cat "$2")
+        echo "Stopping Celery $1 worker pid $PID"
         kill "$PID" >/dev/null 2>&1 || true
         sleep 1
         kill -0 "$PID" >/dev/null 2>&1 || true && kill -9 "$PID" >/dev/null 2>&1 || true
-        rm -f "$CELERY_PID_FILE"
-    else
-        echo "Celery PID file not found; attempting to stop by name..."
-        PIDS=$(pgrep -f "celery") || true
+        rm -f "$2"
+        return 0
+    fi
+    return 1
+}
+
+stop_celery() {
+    FOUND=""
+    stop_worker_pid browser "$CELERY_PID_FILE" && FOUND=1
+    stop_worker_pid planning "$PLANNING_PID_FILE" && FOUND=1
+    stop_worker_pid drive-io "$DRIVE_PID_FILE" && FOUND=1
+    if [ -z "$FOUND" ]; then
+        echo "Celery PID files not found; attempting to stop by name..."
+        PIDS=$(pgrep -f "celery.*worker") || true
         if [ -n "${PIDS:-}" ]; then
             echo "Killing celery pids: $PIDS"
             kill $PIDS || kill -9 $PIDS || true
@@ -162,6 +222,7 @@ start_all() {
     start_redis || true
     start_fastapi || true
     start_celery || true
+    start_beat || true
     start_flower || true
     echo "All start commands issued. Check logs in $LOG_DIR"
 }
@@ -169,6 +230,7 @@ start_all() {
 stop_all() {
     echo "Stopping all services..."
     stop_flower || true
+    stop_beat || true
     stop_celery || true
     stop_fastapi || true
     stop_redis || true
@@ -180,11 +242,12 @@ tail_logs() {
     start_redis || true
     start_fastapi || true
     start_celery || true
+    start_beat || true
     start_flower || true
 
     echo "Tailing logs. Press Ctrl-C to stop tailing (services will keep running)."
     # Use -F to follow even if files rotate
-    tail -F "$FASTAPI_LOG" "$CELERY_LOG" "$FLOWER_LOG" "$REDIS_LOG" &
+    tail -F "$FASTAPI_LOG" "$CELERY_LOG" "$PLANNING_LOG" "$DRIVE_LOG" "$BEAT_LOG" "$FLOWER_LOG" "$REDIS_LOG" &
     TAIL_PID=$!
 
     # Ensure tail is killed on exit of this function (if user presses Ctrl-C)
@@ -198,6 +261,7 @@ tail_fastapi() {
     start_redis || true
     start_fastapi || true
     start_celery || true
+    start_beat || true
     start_flower || true
 
     echo "Tailing FastAPI log. Press Ctrl-C to stop (services will keep running)."
@@ -221,10 +285,19 @@ status() {
     else
         echo "FastAPI: not running"
     fi
-    if [ -f "$CELERY_PID_FILE" ] && kill -0 $(cat "$CELERY_PID_FILE") 2>/dev/null; then
-        echo "Celery: running (pid $(cat $CELERY_PID_FILE))"
+    for POOL_PID in "browser:$CELERY_PID_FILE" "planning:$PLANNING_PID_FILE" "drive-io:$DRIVE_PID_FILE"; do
+        POOL=${POOL_PID%%:*}
+        PID_FILE=${POOL_PID#*:}
+        if [ -f "$PID_FILE" ] && kill -0 $(cat "$PID_FILE") 2>/dev/null; then
+            echo "Celery $POOL: running (pid $(cat $PID_FILE))"
+        else
+            echo "Celery $POOL: not running"
+        fi
+    done
+    if [ -f "$BEAT_PID_FILE" ] && kill -0 $(cat "$BEAT_PID_FILE") 2>/dev/null; then
+        echo "Celery beat: running (pid $(cat $BEAT_PID_FILE))"
     else
-        echo "Celery: not running"
+        echo "Celery beat: not running"
     fi
 }
 